@@ -0,0 +1,275 @@
+"""
+Reproducible throughput benchmark for the resizer and the duplicate cleaner.
+
+    python benchmark.py                          # default matrix, writes benchmark_results.json
+    python benchmark.py --images 200 --workers 1 4 8
+    python benchmark.py --compare old_results.json
+
+A synthetic corpus (mixed sizes, formats and orientations with planted
+near-duplicates) is generated from a fixed seed, so runs on the same machine
+are comparable. Every resize configuration runs in a fresh process so its
+peak RSS is measured on its own.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from resizer import ImageResizer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CORPUS_SIZES = [(640, 480), (1280, 720), (1920, 1080), (3000, 2000), (4000, 3000), (6000, 4000)]
+CORPUS_FORMATS = [("jpg", "JPEG"), ("png", "PNG"), ("webp", "WEBP"), ("bmp", "BMP"), ("tiff", "TIFF")]
+
+DEFAULT_MODES = ["percentage:50", "max:1024", "fit:320x320"]
+DEFAULT_FORMATS = ["JPG", "PNG", "WEBP"]
+DEFAULT_QUALITIES = [85]
+
+
+def synthetic_image(rng, width, height):
+    """
+    Smooth gradients plus noise: compresses like a photo rather than a flat fill.
+    """
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    fx, fy = rng.uniform(0.5, 4), rng.uniform(0.5, 4)
+    base = np.stack([
+        127 + 120 * np.sin(x / width * fx * np.pi + rng.uniform(0, 6)),
+        127 + 120 * np.cos(y / height * fy * np.pi + rng.uniform(0, 6)),
+        127 + 120 * np.sin((x + y) / (width + height) * (fx + fy) * np.pi),
+    ], axis=-1)
+    noise = np.random.default_rng(rng.randrange(2 ** 32)).normal(0, 12, base.shape).astype(np.float32)
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8), "RGB")
+
+
+def generate_corpus(root, count, seed):
+    """
+    Writes count images below root plus a near-duplicate for every 10th one.
+    Returns a description of the corpus.
+    """
+    rng = random.Random(seed)
+    files = []
+    planted = []
+
+    for i in range(count):
+        width, height = rng.choice(CORPUS_SIZES)
+        if rng.random() < 0.4:
+            width, height = height, width  # portrait
+        ext, fmt = CORPUS_FORMATS[i % len(CORPUS_FORMATS)]
+        folder = os.path.join(root, f"set{i % 4}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"img_{i:05d}.{ext}")
+
+        img = synthetic_image(rng, width, height)
+        img.save(path, fmt, **({"quality": 90} if fmt in ("JPEG", "WEBP") else {}))
+        files.append(path)
+
+        if i % 10 == 0:
+            # Near-duplicate: slightly smaller and recompressed
+            dupe_path = os.path.join(root, "dupes", f"img_{i:05d}_copy.jpg")
+            os.makedirs(os.path.dirname(dupe_path), exist_ok=True)
+            img.resize((width * 9 // 10, height * 9 // 10)).save(dupe_path, "JPEG", quality=80)
+            files.append(dupe_path)
+            planted.append([path, dupe_path])
+
+    return {
+        "seed": seed,
+        "images": len(files),
+        "bytes": sum(os.path.getsize(f) for f in files),
+        "planted_duplicates": planted,
+    }
+
+
+def _generate_run(root, count, seed, results):
+    results.put(generate_corpus(root, count, seed))
+
+
+def run_isolated(target, *args):
+    """
+    Runs target(*args, results_queue) in a fresh interpreter and returns what it put.
+    Keeps the large generation buffers out of this process, whose peak RSS would
+    otherwise be inherited by every measured run.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    proc = ctx.Process(target=target, args=(*args, results))
+    proc.start()
+    value = results.get()
+    proc.join()
+    return value
+
+
+def peak_rss_mb(who):
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _resize_run(source, dest, params, results):
+    resizer = ImageResizer()
+    start = time.perf_counter()
+    success, skipped = resizer.resize_images(source, dest, params)
+    elapsed = time.perf_counter() - start
+    results.put({
+        "elapsed": elapsed,
+        "stages": resizer.stats.to_dict()["stage_seconds"],
+        "discovery": resizer.stats.to_dict()["discovery_seconds"],
+        "success": success,
+        "skipped": skipped,
+        "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        "peak_rss_workers_mb": peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+    })
+
+
+def bench_resize(source, corpus, params):
+    """
+    Runs one resize configuration in a fresh process and returns its metrics.
+    """
+    dest = tempfile.mkdtemp(prefix="bench_out_")
+    try:
+        run = run_isolated(_resize_run, source, dest, params)
+        output_bytes = sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(dest) for f in fs)
+    finally:
+        shutil.rmtree(dest, ignore_errors=True)
+
+    return {
+        "images_per_s": round(run["success"] / run["elapsed"], 2),
+        "mb_per_s": round(corpus["bytes"] / (1024 * 1024) / run["elapsed"], 2),
+        "elapsed_s": round(run["elapsed"], 3),
+        "success": run["success"],
+        "skipped": run["skipped"],
+        "output_mb": round(output_bytes / (1024 * 1024), 2),
+        "peak_rss_mb": run["peak_rss_mb"],
+        "peak_rss_workers_mb": run["peak_rss_workers_mb"],
+        "discovery_s": run["discovery"],
+        "stages_s": run["stages"],
+    }
+
+
+def bench_dedupe(source, corpus):
+    from cleaner import ImageCleaner
+
+    start = time.perf_counter()
+    groups = ImageCleaner().find_duplicates(source)
+    elapsed = time.perf_counter() - start
+
+    found = 0
+    for a, b in corpus["planted_duplicates"]:
+        if any(a in g and b in g for g in groups):
+            found += 1
+
+    return {
+        "images_per_s": round(corpus["images"] / elapsed, 2),
+        "elapsed_s": round(elapsed, 3),
+        "groups": len(groups),
+        "planted_found": found,
+        "planted_total": len(corpus["planted_duplicates"]),
+    }
+
+
+def parse_mode(text):
+    mode, value = text.split(":")
+    if mode == "fit":
+        w, h = value.split("x")
+        return mode, (int(w), int(h))
+    return mode, int(value)
+
+
+def config_key(config):
+    return "|".join(f"{k}={config[k]}" for k in sorted(config))
+
+
+def compare(results, previous):
+    """
+    Prints the images/s ratio of every configuration present in both runs.
+    """
+    old = {r["key"]: r for r in previous.get("resize", [])}
+    print("\nComparison (new / old images/s):")
+    for r in results["resize"]:
+        if r["key"] in old and old[r["key"]]["images_per_s"]:
+            ratio = r["images_per_s"] / old[r["key"]]["images_per_s"]
+            print(f"  {ratio:6.2f}x  {r['key']}")
+    if "dedupe" in results and previous.get("dedupe", {}).get("images_per_s"):
+        ratio = results["dedupe"]["images_per_s"] / previous["dedupe"]["images_per_s"]
+        print(f"  {ratio:6.2f}x  dedupe")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resize and dedupe throughput benchmark")
+    parser.add_argument("--images", type=int, default=40, help="Number of synthetic source images")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--modes", nargs="+", default=DEFAULT_MODES, help="MODE:VALUE, e.g. max:1024 or fit:320x320")
+    parser.add_argument("--formats", nargs="+", default=DEFAULT_FORMATS)
+    parser.add_argument("--qualities", nargs="+", type=int, default=DEFAULT_QUALITIES)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, os.cpu_count() or 1])
+    parser.add_argument("--speed", default="quality")
+    parser.add_argument("--encoder-profiles", nargs="+", default=["balanced"])
+    parser.add_argument("--no-dedupe", action="store_true")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    corpus_dir = tempfile.mkdtemp(prefix="bench_corpus_")
+    try:
+        print(f"Generating {args.images} images...")
+        corpus = run_isolated(_generate_run, corpus_dir, args.images, args.seed)
+
+        results = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pillow": Image.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus": {k: v for k, v in corpus.items() if k != "planted_duplicates"},
+            "resize": [],
+        }
+
+        for mode_text, output_format, quality, profile, workers in itertools.product(
+                args.modes, args.formats, args.qualities, args.encoder_profiles, sorted(set(args.workers))):
+            mode, value = parse_mode(mode_text)
+            config = {"mode": mode_text, "format": output_format, "quality": quality,
+                      "encoder_profile": profile, "workers": workers, "speed": args.speed}
+            params = {'mode': mode, 'value': value, 'quality': quality, 'output_format': output_format,
+                      'encoder_profile': profile, 'workers': workers, 'speed': args.speed,
+                      'keep_structure': True}
+
+            metrics = bench_resize(corpus_dir, corpus, params)
+            entry = {"key": config_key(config), "config": config, **metrics}
+            results["resize"].append(entry)
+            print(f"{entry['key']}: {metrics['images_per_s']} img/s, {metrics['mb_per_s']} MB/s, "
+                  f"peak {metrics['peak_rss_mb']} MB")
+
+        if not args.no_dedupe:
+            results["dedupe"] = bench_dedupe(corpus_dir, corpus)
+            print(f"dedupe: {results['dedupe']['images_per_s']} img/s, "
+                  f"{results['dedupe']['planted_found']}/{results['dedupe']['planted_total']} planted found")
+    finally:
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
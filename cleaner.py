@@ -1,88 +1,394 @@
 import os
+import hashlib
 import imagehash
 from PIL import Image
 import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from imaging import IMAGE_EXTENSIONS, init_worker, can_reduce
+from hashindex import find_pairs, hamming, cluster_pairs
+from hashcache import HashCache
+
+# Appended to the algorithm name to form the cache key; change it whenever the
+# hashing itself changes
+CACHE_VERSION = "reduced"
+
+# Exact-duplicate check: files of equal size are compared by a digest of their first
+# PARTIAL_BYTES before reading them in full
+PARTIAL_BYTES = 64 * 1024
+
+# name: (function, decode mode, decode size). Images are decoded at (at least) the
+# decode size for hashing: JPEGs are DCT-scaled with draft() and other formats shrunk
+# with reduce(). aHash/dHash only look at 8x8 (9x8) pixels and pHash at 32x32.
+HASH_FUNCTIONS = {
+    'ahash': (imagehash.average_hash, 'L', 32),
+    'dhash': (imagehash.dhash, 'L', 32),
+    'phash': (imagehash.phash, 'L', 256),
+    'whash': (imagehash.whash, 'L', 256),
+    'colorhash': (imagehash.colorhash, 'RGB', 64),
+}
+
+# Cache writes are batched; a cancelled scan still keeps what it hashed
+CACHE_BATCH = 500
 
 class ImageCleaner:
-    def __init__(self):
+    def __init__(self, cache_path=None):
         self.stop_event = threading.Event()
+        # SQLite hash cache, see hashcache.HashCache (None disables it)
+        self.cache_path = cache_path
+        # Results of the last scan, kept so deletions can be applied without rescanning:
+        # links is {path: {matching path: distance}}, values the hashes they were compared by
+        self.groups = []
+        self.links = {}
+        self.values = {}
+        self.max_diameter = None
 
-    def find_duplicates(self, source_dir, threshold=5, progress_callback=None, log_callback=None):
+    def find_duplicates(self, source_dir, threshold=5, progress_callback=None, log_callback=None, backend='mih',
+                        workers=None, cascade=None, max_diameter=None):
         """
         Scans source_dir for images and finds similar ones.
         threshold: Hamming distance threshold (0 = exact match, higher = more tolerant).
+        backend: hash comparison engine, 'mih' (multi-index hashing) or 'numpy' (vectorized
+        all-pairs scan), see hashindex.
+        workers: hashing processes (default: CPU count, 1 = no pool).
+        cascade: list of (algorithm, threshold) stages, see HASH_FUNCTIONS. The first
+        stage hashes every image and shortlists pairs; each later stage only hashes the
+        shortlisted images and drops the pairs it doesn't confirm.
+        Defaults to [('phash', threshold)], e.g. [('dhash', 10), ('phash', 5)].
+        max_diameter: if set, no two images of a group differ by more than this (in the
+        last stage's hash); otherwise groups are all transitively connected matches.
         Returns a list of lists, where each inner list contains paths of similar images.
+        Groups and the paths in them are sorted, so they don't depend on the walk order.
         """
-        hashes = {}
-        duplicates = []
+        cascade = cascade or [('phash', threshold)]
+        for algorithm, _ in cascade:
+            if algorithm not in HASH_FUNCTIONS:
+                raise ValueError(f"Unknown hash algorithm: {algorithm}")
+
+        self.groups, self.links, self.values = [], {}, {}
         image_files = []
 
         # 1. Collect all image files
         for root, dirs, files in os.walk(source_dir):
             for file in files:
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.webp')):
+                if file.lower().endswith(IMAGE_EXTENSIONS):
                     image_files.append(os.path.join(root, file))
+        image_files.sort()
 
         total_files = len(image_files)
         if total_files == 0:
-            return []
+            return self.groups
 
-        # 2. Calculate hashes
-        for i, file_path in enumerate(image_files):
-            if self.stop_event.is_set():
-                break
-            
+        def stage_progress(start, end):
+            def report(fraction):
+                if progress_callback:
+                    progress_callback(start + fraction * (end - start))
+            return report
+
+        # 2. Byte-identical copies, found without decoding anything
+        stats = {}
+        for file_path in image_files:
             try:
-                with Image.open(file_path) as img:
-                    # Use phash (Perceptual Hash)
-                    h = imagehash.phash(img)
-                    hashes[file_path] = h
-            except Exception as e:
+                stats[file_path] = os.stat(file_path)
+            except OSError as e:
                 if log_callback:
-                    log_callback(f"Error hashing {os.path.basename(file_path)}: {e}")
-            
-            if progress_callback:
-                progress_callback((i + 1) / total_files * 0.5) # First 50% is hashing
-
-        # 3. Compare hashes
-        # This is O(N^2) which is slow for many images. 
-        # For better performance with many images, we could use a BK-tree or similar, 
-        # but for a simple desktop app, a linear scan or grouping by hash might be enough.
-        # To support 'threshold', we need to compare.
-        
-        processed = set()
-        keys = list(hashes.keys())
-        total_comparisons = len(keys)
-        
-        for i in range(len(keys)):
+                    log_callback(f"Error reading {os.path.basename(file_path)}: {e}")
+        exact_groups = self._find_exact_duplicates(image_files, stats, stage_progress(0, 0.1), log_callback)
+
+        # Only one file per exact group needs a perceptual hash
+        copies = {path for group in exact_groups for path in group[1:]}
+        candidates = [path for path in image_files if path in stats and path not in copies]
+
+        # 3. Calculate hashes of the first stage
+        algorithm, stage_threshold = cascade[0]
+        hashes = self._hash_files(source_dir, candidates, stats, algorithm, workers,
+                                  stage_progress(0.1, 0.5), log_callback)
+
+        # 4. Compare hashes
+        # Hashes are packed into uint64 and only candidates sharing a band are compared
+        # (or all pairs in vectorized blocks), instead of one ImageHash subtraction per pair.
+        keys = [path for path in candidates if path in hashes]
+        values = [hash_to_int(hashes[path]) for path in keys]
+
+        compare_end = 1.0 if len(cascade) == 1 else 0.6
+        pair_values = dict(enumerate(values))
+        pairs = find_pairs(values, stage_threshold, progress_callback=stage_progress(0.5, compare_end),
+                           stop_event=self.stop_event, backend=backend)
+
+        # 5. Confirm the shortlist with the remaining (more expensive) hashes
+        step = 0.4 / max(len(cascade) - 1, 1)
+        for n, (algorithm, stage_threshold) in enumerate(cascade[1:]):
+            if not pairs:
+                break
+            shortlist = sorted({k for i, j, _ in pairs for k in (i, j)})
+            start = compare_end + n * step
+            stage_hashes = self._hash_files(source_dir, [keys[k] for k in shortlist], stats, algorithm, workers,
+                                            stage_progress(start, start + step), log_callback)
             if self.stop_event.is_set():
+                # Unconfirmed pairs are not results
+                pairs = []
                 break
-                
-            path1 = keys[i]
-            if path1 in processed:
+            stage_values = {k: hash_to_int(stage_hashes[keys[k]]) for k in shortlist if keys[k] in stage_hashes}
+            confirmed = []
+            for i, j, _ in pairs:
+                if i in stage_values and j in stage_values:
+                    distance = hamming(stage_values[i], stage_values[j])
+                    if distance <= stage_threshold:
+                        confirmed.append((i, j, distance))
+            pairs = confirmed
+            pair_values = stage_values
+
+        # Matches by path. Exact copies share their representative's matches (so the
+        # group survives deleting the representative) and are distance 0 from each other.
+        self.links = {}
+        self.values = {keys[k]: value for k, value in pair_values.items()}
+        self.max_diameter = max_diameter
+        for i, j, distance in pairs:
+            self._link(keys[i], keys[j], distance)
+        for group in exact_groups:
+            # A representative that failed to hash can't match anything else, so any value does
+            value = self.values.setdefault(group[0], 0)
+            matches = list(self.links.get(group[0], {}).items())
+            for n, path in enumerate(group):
+                self.values[path] = value
+                for other in group[:n]:
+                    self._link(other, path, 0)
+                if n:
+                    for other, distance in matches:
+                        self._link(path, other, distance)
+
+        self.groups = self._cluster(sorted(self.links))
+        return self.groups
+
+    def remove_files(self, paths):
+        """
+        Applies deletions to the results of the last scan instead of rescanning.
+        Groups that lose members are re-clustered from the stored matches (a removed
+        image may have been the only link between the others), and dissolve when fewer
+        than two images are left. The files are also dropped from the hash cache.
+        Returns [(index, new groups)] for every changed group, by ascending index into
+        the previous self.groups; unchanged groups keep their place.
+        """
+        removed = set(paths)
+        changes = []
+        groups = []
+        for n, group in enumerate(self.groups):
+            if removed.isdisjoint(group):
+                groups.append(group)
                 continue
-                
-            hash1 = hashes[path1]
-            current_group = [path1]
-            processed.add(path1)
-            
-            for j in range(i + 1, len(keys)):
-                path2 = keys[j]
-                if path2 in processed:
+            new_groups = self._cluster([path for path in group if path not in removed])
+            changes.append((n, new_groups))
+            groups.extend(new_groups)
+        self.groups = groups
+
+        for path in removed:
+            for other in self.links.pop(path, {}):
+                self.links[other].pop(path, None)
+            self.values.pop(path, None)
+
+        if self.cache_path and removed:
+            with HashCache(self.cache_path) as cache:
+                cache.remove(removed)
+        return changes
+
+    def _link(self, a, b, distance):
+        self.links.setdefault(a, {})[b] = distance
+        self.links.setdefault(b, {})[a] = distance
+
+    def _cluster(self, paths):
+        """
+        Connected components (union-find, not greedy seeds) of the stored matches
+        among sorted paths. Returns sorted groups of sorted paths.
+        """
+        index = {path: n for n, path in enumerate(paths)}
+        pairs = [(index[a], index[b], distance)
+                 for a in paths for b, distance in self.links[a].items()
+                 if b in index and index[a] < index[b]]
+        values = [self.values[path] for path in paths]
+        return [[paths[k] for k in component]
+                for component in cluster_pairs(len(paths), pairs, values, self.max_diameter)]
+
+    def _find_exact_duplicates(self, image_files, stats, progress, log_callback):
+        """
+        Groups byte-identical files: by size first, then by a digest of the first
+        PARTIAL_BYTES, and only then by a digest of the whole file.
+        Returns groups (lists of paths in scan order) with at least two members.
+        """
+        by_size = {}
+        for file_path in image_files:
+            if file_path in stats:
+                by_size.setdefault(stats[file_path].st_size, []).append(file_path)
+        same_size = [group for group in by_size.values() if len(group) > 1]
+
+        total = sum(len(group) for group in same_size) or 1
+        done = 0
+        exact_groups = []
+        for group in same_size:
+            if self.stop_event.is_set():
+                break
+
+            by_digest = {}
+            for file_path in group:
+                try:
+                    digest = file_digest(file_path, PARTIAL_BYTES)
+                    by_digest.setdefault(digest, []).append(file_path)
+                except OSError as e:
+                    if log_callback:
+                        log_callback(f"Error reading {os.path.basename(file_path)}: {e}")
+                done += 1
+                progress(done / total)
+
+            for candidates in by_digest.values():
+                if len(candidates) < 2:
                     continue
-                    
-                hash2 = hashes[path2]
-                if hash1 - hash2 <= threshold:
-                    current_group.append(path2)
-                    processed.add(path2)
-            
-            if len(current_group) > 1:
-                duplicates.append(current_group)
-            
-            if progress_callback:
-                progress_callback(0.5 + ((i + 1) / total_comparisons * 0.5))
-
-        return duplicates
+                if stats[candidates[0]].st_size <= PARTIAL_BYTES:
+                    # The partial digest already covered the whole file
+                    exact_groups.append(candidates)
+                    continue
+                by_content = {}
+                for file_path in candidates:
+                    try:
+                        by_content.setdefault(file_digest(file_path), []).append(file_path)
+                    except OSError as e:
+                        if log_callback:
+                            log_callback(f"Error reading {os.path.basename(file_path)}: {e}")
+                exact_groups.extend(g for g in by_content.values() if len(g) > 1)
+
+        progress(1.0)
+        return exact_groups
+
+    def _hash_files(self, source_dir, image_files, stats, algorithm, workers, progress, log_callback):
+        """
+        Returns {path: hex hash}, reusing cached hashes of unchanged files and hashing
+        the rest across a process pool. stats maps every scanned file to its os.stat().
+        """
+        cache_key = f"{algorithm}-{CACHE_VERSION}"
+        total_files = len(image_files) or 1
+        hashes = {}
+        done = [0]
+
+        def advance():
+            done[0] += 1
+            progress(done[0] / total_files)
+
+        cache = HashCache(self.cache_path) if self.cache_path else None
+        cached = cache.load(cache_key, source_dir) if cache else {}
+        new_entries = []
+
+        def store(file_path, stat, h):
+            hashes[file_path] = h
+            if not cache:
+                return
+            new_entries.append((file_path, stat.st_size, stat.st_mtime_ns, h))
+            if len(new_entries) >= CACHE_BATCH:
+                cache.put_many(cache_key, new_entries)
+                new_entries.clear()
+
+        def failed(file_path, e):
+            if log_callback:
+                log_callback(f"Error hashing {os.path.basename(file_path)}: {e}")
+
+        try:
+            # Cache lookups are cheap, so they happen here; only misses go to the pool
+            to_hash = []
+            for file_path in image_files:
+                stat = stats[file_path]
+                entry = cached.get(os.path.abspath(file_path))
+                if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                    hashes[file_path] = entry[2]
+                    advance()
+                else:
+                    to_hash.append((file_path, stat))
+
+            workers = workers or os.cpu_count() or 1
+            if workers > 1 and len(to_hash) > 1:
+                self._hash_in_pool(to_hash, algorithm, workers, store, failed, advance)
+            else:
+                for file_path, stat in to_hash:
+                    if self.stop_event.is_set():
+                        break
+                    try:
+                        store(file_path, stat, hash_image(file_path, algorithm))
+                    except Exception as e:
+                        failed(file_path, e)
+                    advance()
+
+            if cache and not self.stop_event.is_set():
+                # Forget files that were deleted or moved since the last scan
+                seen = {os.path.abspath(p) for p in stats}
+                cache.remove([p for p in cached if p not in seen])
+        finally:
+            if cache:
+                cache.put_many(cache_key, new_entries)
+                cache.close()
+
+        return hashes
+
+    def _hash_in_pool(self, to_hash, algorithm, workers, store, failed, advance):
+        pending = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            for file_path, stat in to_hash:
+                if self.stop_event.is_set():
+                    break
+                # A small backlog keeps cancelling responsive
+                while len(pending) >= workers * 4:
+                    self._collect(pending, wait(pending, return_when=FIRST_COMPLETED)[0], store, failed, advance)
+                pending[executor.submit(hash_image, file_path, algorithm)] = (file_path, stat)
+
+            if self.stop_event.is_set():
+                for future in list(pending):
+                    if future.cancel():
+                        del pending[future]
+            self._collect(pending, list(pending), store, failed, advance)
+
+    def _collect(self, pending, done, store, failed, advance):
+        for future in done:
+            file_path, stat = pending.pop(future)
+            try:
+                store(file_path, stat, future.result())
+            except Exception as e:
+                failed(file_path, e)
+            advance()
 
     def stop(self):
         self.stop_event.set()
+
+
+def hash_to_int(image_hash):
+    """
+    Packs an imagehash.ImageHash (or its hex string) into a plain int for fast Hamming distances.
+    """
+    return int(str(image_hash), 16)
+
+
+def file_digest(file_path, limit=None):
+    """
+    BLAKE2b digest of a file's content (or of its first limit bytes).
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    remaining = limit
+    with open(file_path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(1024 * 1024 if remaining is None else min(remaining, 1024 * 1024))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.digest()
+
+
+def hash_image(file_path, algorithm='phash'):
+    """
+    Perceptual hash of one image as a hex string. Module level so it can run in
+    worker processes.
+    """
+    function, mode, decode_size = HASH_FUNCTIONS[algorithm]
+    with Image.open(file_path) as img:
+        img.draft(mode, (decode_size, decode_size))
+        factor = min(img.width, img.height) // decode_size
+        if factor > 1:
+            if not can_reduce(img):
+                # e.g. 16-bit greyscale; the hash converts to this mode anyway
+                img = img.convert(mode)
+            img = img.reduce(factor)
+        return str(function(img))
@@ -0,0 +1,312 @@
+"""
+Headless command line entry point for the resizer and the duplicate cleaner.
+
+    python -m cli resize SOURCE DEST --mode max --value 1920 --format WEBP
+    python -m cli clean SOURCE --threshold 5
+
+Prints a JSON summary to stdout. Exit codes: 0 = success, 1 = some images failed,
+2 = invalid arguments, 130 = cancelled (Ctrl+C).
+Does not import tkinter/customtkinter so it runs on machines without a display.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+# Reasons reported by the resizer that are not errors
+SKIP_REASONS = ("vertical", "horizontal", "unchanged", "copied")
+
+OUTPUT_FORMATS = ("JPG", "PNG", "WEBP", "Original")
+
+
+def parse_value(mode, text):
+    if mode == "fit":
+        w, h = text.lower().split("x")
+        return int(w), int(h)
+    return int(text)
+
+
+def parse_rendition(text):
+    """
+    MODE:VALUE[:FORMAT[:QUALITY[:SUBFOLDER]]], e.g. max:2048 or fit:320x320:WEBP:80
+    """
+    parts = text.split(":")
+    if len(parts) < 2:
+        raise argparse.ArgumentTypeError(f"invalid rendition '{text}'")
+    try:
+        rendition = {"mode": parts[0], "value": parse_value(parts[0], parts[1])}
+        if len(parts) > 2 and parts[2]:
+            # Matched case-insensitively, but passed on spelled like --format
+            formats = {f.lower(): f for f in OUTPUT_FORMATS}
+            rendition["output_format"] = formats[parts[2].lower()]
+        if len(parts) > 3 and parts[3]:
+            rendition["quality"] = int(parts[3])
+        if len(parts) > 4 and parts[4]:
+            rendition["subfolder"] = parts[4]
+    except (ValueError, KeyError):
+        raise argparse.ArgumentTypeError(f"invalid rendition '{text}'")
+    return rendition
+
+
+def parse_hash_stage(text):
+    """
+    ALGORITHM:THRESHOLD, e.g. dhash:10
+    """
+    from cleaner import HASH_FUNCTIONS
+
+    algorithm, _, threshold = text.partition(":")
+    if algorithm not in HASH_FUNCTIONS or not threshold.isdigit():
+        raise argparse.ArgumentTypeError(f"invalid hash stage '{text}'")
+    return algorithm, int(threshold)
+
+
+def build_parser():
+    # Choices come from the modules that implement them
+    from resizer import SPEED_PRESETS, ENCODER_PROFILES, PASSTHROUGH_METHODS, SCHEDULES
+    from hashindex import BACKENDS
+
+    parser = argparse.ArgumentParser(prog="cli", description="Image Resizer & Cleaner Pro (headless)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("resize", help="Resize all images below a folder")
+    p.add_argument("source")
+    p.add_argument("dest")
+    p.add_argument("--mode", choices=["percentage", "width", "height", "max", "fit"], default="percentage")
+    p.add_argument("--value", help="Number, or WxH for --mode fit (required unless --rendition is given)")
+    p.add_argument("--quality", type=int, default=95)
+    p.add_argument("--format", dest="output_format", choices=OUTPUT_FORMATS, default="JPG")
+    p.add_argument("--speed", choices=list(SPEED_PRESETS), default="quality")
+    p.add_argument("--encoder-profile", choices=list(ENCODER_PROFILES), default="balanced")
+    p.add_argument("--lossless", action="store_true", help="Lossless WEBP output")
+    p.add_argument("--no-enlarge", action="store_true")
+    p.add_argument("--skip-vertical", action="store_true")
+    p.add_argument("--skip-horizontal", action="store_true")
+    p.add_argument("--flatten", action="store_true", help="Don't preserve the folder structure")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    p.add_argument("--incremental", action="store_true", help="Skip images that are already up to date")
+    p.add_argument("--passthrough", choices=PASSTHROUGH_METHODS, default="reflink",
+                   help="How to write images that need no resampling with --format Original "
+                        "(default: reflink, falling back to a copy)")
+    p.add_argument("--schedule", choices=SCHEDULES, default="largest",
+                   help="Order of work: biggest images first (default) or folder walk order")
+    p.add_argument("--rendition", action="append", type=parse_rendition, default=[],
+                   help="Extra output, MODE:VALUE[:FORMAT[:QUALITY[:SUBFOLDER]]] (repeatable)")
+    p.add_argument("--profile", metavar="FILE", help="Write cProfile stats to FILE (runs single-process)")
+    p.add_argument("--plan", action="store_true",
+                   help="Only print the plan (ETA, output size, free space) without resizing")
+    p.add_argument("--preflight", action="store_true",
+                   help="Plan before resizing, for an ETA and a free space check (reads every header first)")
+    p.add_argument("--force", action="store_true", help="Resize even if the destination looks too small")
+    p.add_argument("--verbose", action="store_true", help="Log every file to stderr")
+
+    c = sub.add_parser("clean", help="Find duplicate images below a folder")
+    c.add_argument("source")
+    c.add_argument("--threshold", type=int, default=5, help="Hamming distance (0 = identical)")
+    c.add_argument("--cache", metavar="FILE", help="SQLite hash cache to reuse between scans")
+    c.add_argument("--workers", type=int, default=None, help="Hashing processes (default: CPU count)")
+    c.add_argument("--backend", choices=BACKENDS, default="mih",
+                   help="Hash comparison engine: multi-index hashing (default) or the NumPy all-pairs scan")
+    c.add_argument("--hash", dest="cascade", action="append", type=parse_hash_stage, default=[],
+                   help="Hash stage ALGORITHM:THRESHOLD (repeatable, cheapest first), e.g. "
+                        "--hash dhash:10 --hash phash:5. Default: phash with --threshold")
+    c.add_argument("--max-diameter", type=int, default=None,
+                   help="Largest distance allowed between any two images of a group (default: no limit)")
+    c.add_argument("--verbose", action="store_true", help="Log errors to stderr")
+
+    return parser
+
+
+def run_cancellable(worker, stop):
+    """
+    Runs worker() on a thread so Ctrl+C can request a clean stop instead of
+    tearing the run down mid-write. Returns (result, cancelled).
+    """
+    result = {}
+
+    def target():
+        try:
+            result["value"] = worker()
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    cancelled = False
+    while thread.is_alive():
+        try:
+            thread.join(0.2)
+        except KeyboardInterrupt:
+            cancelled = True
+            stop()
+    if "error" in result:
+        raise result["error"]
+    return result.get("value"), cancelled
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def cmd_resize(args, parser):
+    from resizer import ImageResizer
+    from planner import plan_resize, format_duration
+
+    if not os.path.isdir(args.source):
+        parser.error(f"source folder not found: {args.source}")
+    if args.value is None and not args.rendition:
+        parser.error("--value is required unless --rendition is given")
+
+    params = {
+        'mode': args.mode,
+        'quality': args.quality,
+        'no_enlarge': args.no_enlarge,
+        'skip_vertical': args.skip_vertical,
+        'skip_horizontal': args.skip_horizontal,
+        'keep_structure': not args.flatten,
+        'output_format': args.output_format,
+        'speed': args.speed,
+        'encoder_profile': args.encoder_profile,
+        'lossless': args.lossless,
+        'incremental': args.incremental,
+        'schedule': args.schedule,
+        'passthrough': args.passthrough,
+    }
+    if args.value is not None:
+        try:
+            params['value'] = parse_value(args.mode, args.value)
+        except ValueError:
+            parser.error(f"invalid --value: {args.value}")
+    if args.workers:
+        params['workers'] = args.workers
+    if args.rendition:
+        params['renditions'] = args.rendition
+    if args.profile:
+        params['profile'] = args.profile
+
+    plan = None
+    if args.plan or args.preflight:
+        # Header-only pre-flight pass plus a few calibration samples
+        planning = threading.Event()
+        plan, cancelled = run_cancellable(
+            lambda: plan_resize(args.source, args.dest, params, stop_event=planning), planning.set)
+        if cancelled:
+            return EXIT_CANCELLED
+        if args.verbose or args.plan or not plan.enough_space:
+            for line in plan.summary():
+                log(line)
+        if args.plan:
+            print(json.dumps({"command": "plan", "plan": plan.to_dict()}, indent=2))
+            return EXIT_OK if plan.enough_space else EXIT_FAILED
+        if not plan.enough_space and not args.force:
+            log("Not enough free space on the destination; use --force to resize anyway")
+            return EXIT_FAILED
+
+    reasons = {}
+    errors = []
+    last_status = [0.0]
+
+    def on_stats(record):
+        # Live throughput and refined ETA, at most every 2 seconds
+        if not args.verbose or time.perf_counter() - last_status[0] < 2:
+            return
+        last_status[0] = time.perf_counter()
+        images_per_second, megabytes_per_second = resizer.stats.throughput()
+        if plan is None:
+            log(f"{resizer.stats.files} images, {images_per_second:.1f} images/s, {megabytes_per_second:.1f} MB/s")
+            return
+        remaining = plan.remaining_seconds(resizer.stats)
+        log(f"{resizer.stats.files}/{plan.files + plan.skipped} images, {images_per_second:.1f} images/s, "
+            f"{megabytes_per_second:.1f} MB/s" + (f", ETA {format_duration(remaining)}" if remaining is not None else ""))
+
+    def on_skip(file, reason):
+        if reason in SKIP_REASONS:
+            reasons[reason] = reasons.get(reason, 0) + 1
+        else:
+            errors.append({"file": file, "error": reason})
+        if args.verbose:
+            log(f"Copied: {file}" if reason == "copied" else f"Skipped: {file}: {reason}")
+
+    resizer = ImageResizer()
+    start = time.perf_counter()
+    (success, skipped), cancelled = run_cancellable(
+        lambda: resizer.resize_images(args.source, args.dest, params,
+                                      log_callback=log if args.verbose else None,
+                                      skip_callback=on_skip, stats_callback=on_stats),
+        resizer.stop)
+
+    summary = {
+        "command": "resize",
+        "source": os.path.abspath(args.source),
+        "dest": os.path.abspath(args.dest),
+        "processed": success,
+        "skipped": skipped,
+        "skipped_by_reason": reasons,
+        "errors": errors,
+        "cancelled": cancelled,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+        "stats": resizer.stats.to_dict(),
+        "plan": plan.to_dict() if plan is not None else None,
+    }
+    print(json.dumps(summary, indent=2))
+
+    if cancelled:
+        return EXIT_CANCELLED
+    return EXIT_FAILED if errors else EXIT_OK
+
+
+def cmd_clean(args, parser):
+    from cleaner import ImageCleaner
+
+    if not os.path.isdir(args.source):
+        parser.error(f"source folder not found: {args.source}")
+
+    errors = []
+
+    def on_log(message):
+        errors.append(message)
+        if args.verbose:
+            log(message)
+
+    cleaner = ImageCleaner(cache_path=args.cache)
+    start = time.perf_counter()
+    groups, cancelled = run_cancellable(
+        lambda: cleaner.find_duplicates(args.source, threshold=args.threshold, log_callback=on_log,
+                                        backend=args.backend, workers=args.workers, cascade=args.cascade,
+                                        max_diameter=args.max_diameter),
+        cleaner.stop)
+
+    summary = {
+        "command": "clean",
+        "source": os.path.abspath(args.source),
+        "threshold": args.threshold,
+        "cascade": args.cascade,
+        "groups": groups,
+        "duplicate_files": sum(len(g) - 1 for g in groups),
+        "errors": errors,
+        "cancelled": cancelled,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+    print(json.dumps(summary, indent=2))
+
+    if cancelled:
+        return EXIT_CANCELLED
+    return EXIT_FAILED if errors else EXIT_OK
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "resize":
+        return cmd_resize(args, parser)
+    return cmd_clean(args, parser)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import os
+import sqlite3
+
+
+class HashCache:
+    """
+    SQLite cache of image hashes keyed by path, file size, mtime and hash algorithm.
+    An entry is only reused while size and mtime still match the file on disk.
+    Open it on the thread that uses it (sqlite connections are per thread).
+    """
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            " path TEXT NOT NULL,"
+            " algorithm TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime INTEGER NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " PRIMARY KEY (path, algorithm))"
+        )
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load(self, algorithm, root=None):
+        """
+        Returns {path: (size, mtime, hash)} for one algorithm, optionally limited to
+        paths below root. One query is much faster than a lookup per file.
+        """
+        if root:
+            prefix = os.path.join(os.path.abspath(root), "")
+            rows = self.conn.execute(
+                "SELECT path, size, mtime, hash FROM hashes WHERE algorithm = ? AND substr(path, 1, ?) = ?",
+                (algorithm, len(prefix), prefix))
+        else:
+            rows = self.conn.execute("SELECT path, size, mtime, hash FROM hashes WHERE algorithm = ?", (algorithm,))
+        return {path: (size, mtime, value) for path, size, mtime, value in rows}
+
+    def put_many(self, algorithm, entries):
+        """
+        entries: iterable of (path, size, mtime, hash).
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO hashes (path, algorithm, size, mtime, hash) VALUES (?, ?, ?, ?, ?)",
+            [(os.path.abspath(path), algorithm, size, mtime, value) for path, size, mtime, value in entries])
+        self.conn.commit()
+
+    def remove(self, paths):
+        self.conn.executemany("DELETE FROM hashes WHERE path = ?", [(os.path.abspath(p),) for p in paths])
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
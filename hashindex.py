@@ -0,0 +1,174 @@
+import numpy as np
+
+# Hashes compared per vectorized step (rows x columns); bounds the temporary matrices
+BLOCK_ELEMENTS = 4_000_000
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+BACKENDS = ('mih', 'numpy')
+
+# Multi-index hashing needs bands at least this wide to narrow things down; for
+# thresholds that leave narrower bands the brute-force scan is faster
+MIN_BAND_BITS = 6
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class UnionFind:
+    """
+    Disjoint sets over 0..n-1 with path halving and union by size. Every root also
+    keeps the member list of its set so groups can be checked before merging.
+    """
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.members = {i: [i] for i in range(n)}
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if len(self.members[a]) < len(self.members[b]):
+            a, b = b, a
+        self.parent[b] = a
+        self.members[a].extend(self.members.pop(b))
+        return a
+
+    def groups(self):
+        """
+        Sets with more than one member, each sorted, ordered by their smallest member.
+        """
+        return sorted(sorted(m) for m in self.members.values() if len(m) > 1)
+
+
+def cluster_pairs(count, pairs, values=None, max_diameter=None):
+    """
+    Merges (i, j, distance) pairs into connected components (see UnionFind.groups).
+    With max_diameter, two components are only joined while every hash in the result
+    stays within max_diameter of every other (values[i] is the hash of item i), which
+    stops long A~B~C~... chains from collapsing into one group. Pairs are merged
+    closest first so the result doesn't depend on their order.
+    """
+    sets = UnionFind(count)
+    for i, j, distance in sorted(pairs, key=lambda p: (p[2], p[0], p[1])):
+        a, b = sets.find(i), sets.find(j)
+        if a == b:
+            continue
+        if max_diameter is not None and any(
+                hamming(values[x], values[y]) > max_diameter
+                for x in sets.members[a] for y in sets.members[b]):
+            continue
+        sets.union(a, b)
+    return sets.groups()
+
+
+def popcount64(values):
+    """
+    Number of set bits of every element of a uint64 array.
+    """
+    if hasattr(np, 'bitwise_count'):  # NumPy 2.0+
+        return np.bitwise_count(values)
+    as_bytes = values.view(np.uint8).reshape(values.shape + (8,))
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def find_pairs(hashes, threshold, progress_callback=None, stop_event=None, backend='mih'):
+    """
+    Returns sorted (i, j, distance) for every i < j with hamming(hashes[i], hashes[j]) <= threshold.
+    hashes is a list of 64-bit ints; progress_callback receives a 0..1 fraction.
+    backend is 'mih' (multi-index hashing, near-linear for small thresholds) or
+    'numpy' (blocked, vectorized all-pairs popcount).
+    """
+    if backend == 'mih':
+        return _find_pairs_mih(hashes, threshold, progress_callback, stop_event)
+    return _find_pairs_numpy(hashes, threshold, progress_callback, stop_event)
+
+
+def hash_bands(bits, threshold):
+    """
+    Splits bits into threshold + 1 bands as (shift, mask) pairs. Two hashes within
+    threshold of each other differ in at most threshold bits, so (pigeonhole) they
+    agree exactly on at least one band.
+    """
+    count = threshold + 1
+    bands = []
+    shift = 0
+    for n in range(count):
+        width = bits // count + (1 if n < bits % count else 0)
+        bands.append((shift, (1 << width) - 1))
+        shift += width
+    return bands
+
+
+def _find_pairs_numpy(hashes, threshold, progress_callback, stop_event):
+    values = np.array(hashes, dtype=np.uint64)
+    total = len(values)
+    block = max(1, BLOCK_ELEMENTS // max(total, 1))
+
+    pairs = []
+    for start in range(0, total, block):
+        if stop_event is not None and stop_event.is_set():
+            break
+        end = min(start + block, total)
+
+        # Rows [start, end) against columns [start, total): the upper triangle only
+        distances = popcount64(values[start:end, None] ^ values[None, start:])
+        rows, cols = np.nonzero(distances <= threshold)
+        keep = cols > rows  # both offsets are relative to start
+        rows, cols = rows[keep], cols[keep]
+        found = distances[rows, cols]
+        pairs.extend(zip((rows + start).tolist(), (cols + start).tolist(), found.tolist()))
+
+        if progress_callback:
+            # Later blocks have fewer columns; report progress by work done
+            done = end * total - end * end / 2
+            progress_callback(done / (total * total / 2))
+
+    pairs.sort()
+    return pairs
+
+
+def _find_pairs_mih(hashes, threshold, progress_callback, stop_event):
+    values = np.array(hashes, dtype=np.uint64)
+    bits = max((int(v).bit_length() for v in hashes), default=0)
+    if bits // (threshold + 1) < MIN_BAND_BITS:
+        return _find_pairs_numpy(hashes, threshold, progress_callback, stop_event)
+
+    bands = [(np.uint64(shift), np.uint64(mask)) for shift, mask in hash_bands(bits, threshold)]
+    pairs = []
+    for n, (shift, mask) in enumerate(bands):
+        # Candidates share this band's bits: sort by it, then equal keys are neighbours
+        keys = (values >> shift) & mask
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        offset = 1
+        while offset < len(order):
+            if stop_event is not None and stop_event.is_set():
+                return sorted(pairs)
+            same = keys[offset:] == keys[:-offset]
+            if not same.any():
+                break  # sorted, so no run of equal keys is longer than this
+            a, b = order[:-offset][same], order[offset:][same]
+            diff = values[a] ^ values[b]
+            keep = popcount64(diff) <= threshold
+            for earlier_shift, earlier_mask in bands[:n]:
+                # Already found through an earlier band
+                keep &= ((diff >> earlier_shift) & earlier_mask) != 0
+            a, b = a[keep], b[keep]
+            found = popcount64(diff[keep])
+            pairs.extend(zip(np.minimum(a, b).tolist(), np.maximum(a, b).tolist(), found.tolist()))
+            offset += 1
+
+        if progress_callback:
+            progress_callback((n + 1) / len(bands))
+
+    pairs.sort()
+    return pairs
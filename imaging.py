@@ -0,0 +1,23 @@
+import signal
+from PIL import Image
+
+# Disable DecompressionBombError for large images. Set here so every process that
+# opens images gets it, including pool workers started with spawn (Windows, macOS).
+Image.MAX_IMAGE_PIXELS = None
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.webp')
+
+
+def init_worker():
+    """
+    Pool initializer: Ctrl+C is handled by the parent through its stop_event,
+    workers just finish the image they are on.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def can_reduce(img):
+    """
+    True if img.reduce() (and resize() with reducing_gap) supports the image's mode.
+    """
+    return img.mode not in ('1', 'P') and not img.mode.startswith('I;16')
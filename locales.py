@@ -15,21 +15,37 @@ TRANSLATIONS = {
         "mode_fit": "Fit (WxH)",
         "quality": "Quality:",
         "format": "Format:",
+        "speed": "Speed:",
+        "speed_quality": "Best Quality",
+        "speed_balanced": "Balanced",
+        "speed_fast": "Fast",
+        "encoder": "Compression:",
+        "profile_fastest": "Fastest",
+        "profile_balanced": "Balanced",
+        "profile_smallest": "Smallest",
         "no_enlarge": "Don't Enlarge",
         "skip_vertical": "Skip Vertical",
         "skip_horizontal": "Skip Horizontal",
         "keep_structure": "Preserve Folder Structure",
+        "incremental": "Skip Unchanged",
         "start_resizing": "Start Resizing",
         "cancel": "Cancel",
         "ready": "Resizer Ready...",
         "cleaner_ready": "Cleaner Ready...",
         "starting": "Starting...",
         "stopping": "Stopping...",
+        "preflight": "Pre-flight Plan",
+        "planning": "Planning (reading image headers)...",
+        "low_space": "The destination may not have enough free space for the output. Continue anyway?",
         "completed": "Completed Successfully!",
         "completed_count": "Completed: processed {} images.",
         "skipped_log": "Skipped / Errors:",
+        "log_truncated": "... showing the last {} lines, full log: {}",
+        "log_dropped": "... {} lines skipped here, see the log file",
         "skipped_vertical": "Skipped (Vertical)",
         "skipped_horizontal": "Skipped (Horizontal)",
+        "skipped_unchanged": "Up to date",
+        "skipped_copied": "Copied as is (no resize needed)",
         "cancelled": "Cancelled.",
         "error_select_dirs": "Please select both source and destination folders.",
         "error_invalid_input": "Invalid input: {}",
@@ -37,6 +53,11 @@ TRANSLATIONS = {
         "done_msg": "Image resizing completed!",
         "select_folder": "Select Folder",
         "scan": "Scan",
+        "hash_shortlist": "Shortlist:",
+        "hash_confirm": "Match:",
+        "hash_threshold": "Threshold:",
+        "hash_off": "Off",
+        "error_threshold": "Thresholds must be whole numbers.",
         "select_all": "Select All",
         "deselect_all": "Deselect All",
         "select_first": "Select Others (Keep One)",
@@ -71,21 +92,37 @@ TRANSLATIONS = {
         "mode_fit": "Sığdır (GxE)",
         "quality": "Kalite:",
         "format": "Format:",
+        "speed": "Hız:",
+        "speed_quality": "En İyi Kalite",
+        "speed_balanced": "Dengeli",
+        "speed_fast": "Hızlı",
+        "encoder": "Sıkıştırma:",
+        "profile_fastest": "En Hızlı",
+        "profile_balanced": "Dengeli",
+        "profile_smallest": "En Küçük",
         "no_enlarge": "Büyütme Yapma",
         "skip_vertical": "Dikey Olanları Atla",
         "skip_horizontal": "Yatay Olanları Atla",
         "keep_structure": "Klasör Yapısını Koru",
+        "incremental": "Değişmeyenleri Atla",
         "start_resizing": "İşlemi Başlat",
         "cancel": "İptal Et",
         "ready": "Hazır...",
         "cleaner_ready": "Temizleyici Hazır...",
         "starting": "Başlatılıyor...",
         "stopping": "Durduruluyor...",
+        "preflight": "Ön Planlama",
+        "planning": "Planlanıyor (görsel başlıkları okunuyor)...",
+        "low_space": "Hedefte çıktı için yeterli boş alan olmayabilir. Yine de devam edilsin mi?",
         "completed": "Başarıyla Tamamlandı!",
         "completed_count": "Tamamlandı: {} görsel işlendi.",
         "skipped_log": "Atlananlar / Hatalar:",
+        "log_truncated": "... son {} satır gösteriliyor, tam kayıt: {}",
+        "log_dropped": "... {} satır burada atlandı, kayıt dosyasına bakın",
         "skipped_vertical": "Atlandı (Dikey)",
         "skipped_horizontal": "Atlandı (Yatay)",
+        "skipped_unchanged": "Güncel",
+        "skipped_copied": "Olduğu gibi kopyalandı (boyutlandırma gerekmedi)",
         "cancelled": "İptal Edildi.",
         "error_select_dirs": "Lütfen hem kaynak hem de hedef klasörleri seçin.",
         "error_invalid_input": "Geçersiz giriş: {}",
@@ -93,6 +130,11 @@ TRANSLATIONS = {
         "done_msg": "Görsel boyutlandırma tamamlandı!",
         "select_folder": "Klasör Seç",
         "scan": "Tara",
+        "hash_shortlist": "Ön Eleme:",
+        "hash_confirm": "Eşleştirme:",
+        "hash_threshold": "Eşik:",
+        "hash_off": "Kapalı",
+        "error_threshold": "Eşik değerleri tam sayı olmalıdır.",
         "select_all": "Tümünü Seç",
         "deselect_all": "Seçimi Kaldır",
         "select_first": "Birer Tane Bırak",
@@ -3,8 +3,14 @@ from tkinter import filedialog, messagebox
 import threading
 import os
 import json
+import multiprocessing
+import time
+import logging
 from resizer import ImageResizer
+from planner import plan_resize, format_duration
 from cleaner import ImageCleaner
+from thumbnails import ThumbnailCache
+from uievents import UIEventQueue
 from tkinterdnd2 import TkinterDnD, DND_ALL
 from locales import TRANSLATIONS
 import sys
@@ -19,6 +25,51 @@ def resource_path(relative_path):
 
 # Configuration File
 CONFIG_FILE = "config.json"
+# Perceptual hash cache of the cleaner, kept next to the config
+HASH_CACHE_FILE = "hash_cache.db"
+
+# Worker threads post progress/log events that the Tk loop applies every UI_POLL_MS
+UI_POLL_MS = 50
+
+# Log widgets keep only the most recent lines; the full log of every run goes to its
+# own file, LOG_DIR/<name>-<timestamp>.log, and the newest LOG_RUNS_KEPT are kept
+MAX_LOG_LINES = 2000
+LOG_DIR = "logs"
+LOG_RUNS_KEPT = 20
+
+# Saved previews of the cleaner results
+THUMBNAIL_CACHE_DIR = "thumbnails"
+
+# Duplicate groups shown (and turned into widgets) per page of cleaner results
+RESULTS_PER_PAGE = 50
+
+def file_logger(name):
+    """ Logger for the full log of one kind of run, pointed at a file by start_run_log """
+    logger = logging.getLogger(f"imageresizer.{name}")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+def start_run_log(logger, name):
+    """ Sends logger to a new LOG_DIR/<name>-<timestamp>.log, deletes old ones, returns its path """
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    os.makedirs(LOG_DIR, exist_ok=True)
+    path = os.path.join(LOG_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.log")
+    handler = logging.FileHandler(path, encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+
+    # Timestamps sort by name; the new file counts towards LOG_RUNS_KEPT
+    old_logs = sorted(f for f in os.listdir(LOG_DIR)
+                      if f.startswith(f"{name}-") and f.endswith(".log") and f != os.path.basename(path))
+    for file in old_logs[:max(0, len(old_logs) - LOG_RUNS_KEPT + 1)]:
+        try:
+            os.remove(os.path.join(LOG_DIR, file))
+        except OSError:
+            pass
+    return path
 
 class App(ctk.CTk, TkinterDnD.DnDWrapper):
     def __init__(self):
@@ -50,6 +101,15 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         except Exception as e:
             print(f"Icon error: {e}")
 
+        # Events from worker threads, applied on the Tk thread in batches
+        self.ui_events = UIEventQueue()
+        self.after(UI_POLL_MS, self.drain_ui_events)
+        # Complete logs; the widgets only show the tail
+        self.file_logs = {name: file_logger(name) for name in ("resizer", "skipped", "cleaner")}
+        self.log_paths = {}  # name -> file of the current run, see start_run_logs
+
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1) # Tab view expands
         self.grid_rowconfigure(1, weight=0) # Bottom settings button
@@ -68,6 +128,11 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         self.btn_settings = ctk.CTkButton(self, text="⚙", width=30, height=30, command=self.open_settings, font=("Arial", 20), fg_color="transparent", text_color=("gray10", "gray90"), hover_color=("gray70", "gray30"))
         self.btn_settings.grid(row=1, column=0, padx=20, pady=(0, 20), sticky="e")
 
+    def on_close(self):
+        # Stop the thumbnail threads so closing the window doesn't wait on queued previews
+        self.thumbnails.shutdown()
+        self.destroy()
+
     def t(self, key):
         return TRANSLATIONS.get(self.config["language"], TRANSLATIONS["en"]).get(key, key)
 
@@ -182,9 +247,31 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         self.option_format.set("JPG")
         self.option_format.grid(row=3, column=3, padx=(5, 15), pady=5, sticky="ew")
 
+        # Encoder Profile (compression effort vs. output size)
+        self.profiles_dict = {
+            self.t("profile_fastest"): "fastest",
+            self.t("profile_balanced"): "balanced",
+            self.t("profile_smallest"): "smallest"
+        }
+        ctk.CTkLabel(self.frame_config, text=self.t("encoder")).grid(row=4, column=0, padx=(15, 5), pady=5, sticky="w")
+        self.option_profile = ctk.CTkOptionMenu(self.frame_config, values=list(self.profiles_dict.keys()), width=100)
+        self.option_profile.set(self.t("profile_balanced"))
+        self.option_profile.grid(row=4, column=1, padx=5, pady=5, sticky="ew")
+
+        # Speed Row (JPEG draft decoding / reduce() before resampling)
+        self.speeds_dict = {
+            self.t("speed_quality"): "quality",
+            self.t("speed_balanced"): "balanced",
+            self.t("speed_fast"): "fast"
+        }
+        ctk.CTkLabel(self.frame_config, text=self.t("speed")).grid(row=4, column=2, padx=5, pady=5, sticky="e")
+        self.option_speed = ctk.CTkOptionMenu(self.frame_config, values=list(self.speeds_dict.keys()), width=100)
+        self.option_speed.set(self.t("speed_quality"))
+        self.option_speed.grid(row=4, column=3, padx=(5, 15), pady=5, sticky="ew")
+
         # Checkboxes Container
         self.frame_checks = ctk.CTkFrame(self.frame_config, fg_color="transparent")
-        self.frame_checks.grid(row=4, column=0, columnspan=4, padx=10, pady=(5, 10), sticky="ew")
+        self.frame_checks.grid(row=5, column=0, columnspan=4, padx=10, pady=(5, 10), sticky="ew")
 
         self.check_no_enlarge = ctk.CTkCheckBox(self.frame_checks, text=self.t("no_enlarge"))
         self.check_no_enlarge.pack(side="left", padx=10, pady=5)
@@ -199,6 +286,13 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         self.check_keep_structure.select()
         self.check_keep_structure.pack(side="left", padx=10, pady=5)
 
+        self.check_incremental = ctk.CTkCheckBox(self.frame_checks, text=self.t("incremental"))
+        self.check_incremental.pack(side="left", padx=10, pady=5)
+
+        # Off by default: the pre-flight pass reads every header before the first image is resized
+        self.check_plan = ctk.CTkCheckBox(self.frame_checks, text=self.t("preflight"))
+        self.check_plan.pack(side="left", padx=10, pady=5)
+
         # --- Action Frame ---
         self.frame_action = ctk.CTkFrame(self.tab_resizer, fg_color="transparent")
         self.frame_action.grid(row=3, column=0, padx=15, pady=5, sticky="ew")
@@ -211,6 +305,10 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         self.progress_bar = ctk.CTkProgressBar(self.frame_action, height=12)
         # Initially hidden
 
+        # Live throughput and ETA, shown next to the progress bar during a run
+        self.lbl_run_status = ctk.CTkLabel(self.frame_action, text="")
+        self.run_plan = None
+
         # --- Log Areas ---
         self.frame_logs = ctk.CTkFrame(self.tab_resizer, fg_color="transparent")
         self.frame_logs.grid(row=4, column=0, padx=10, pady=10, sticky="nsew")
@@ -298,10 +396,17 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         self.tab_cleaner.grid_columnconfigure(0, weight=1)
         self.tab_cleaner.grid_rowconfigure(3, weight=1) # Results row expands
 
-        self.cleaner = ImageCleaner()
+        self.cleaner = ImageCleaner(cache_path=HASH_CACHE_FILE)
         self.cleaner_source_dir = ""
         self.duplicates = []
-        self.check_vars = {}
+        # Plain set instead of a BooleanVar per file; only the visible page has widgets
+        self.selected_files = set()
+        self.result_page = 0
+        self.page_checkboxes = {}
+        # Previews are loaded off the Tk thread, only for the visible page
+        self.thumbnails = ThumbnailCache(cache_dir=THUMBNAIL_CACHE_DIR)
+        self.page_thumbnails = {}
+        self.page_generation = 0
 
         # 1. Source Selection Frame
         self.frame_cleaner_source = ctk.CTkFrame(self.tab_cleaner, fg_color="transparent")
@@ -323,6 +428,37 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
                                       height=40, state="disabled")
         self.btn_scan.grid(row=0, column=2, padx=(10, 0), pady=0)
 
+        # Hash cascade: a cheap hash shortlists pairs, the match hash confirms them
+        self.frame_cleaner_hashes = ctk.CTkFrame(self.frame_cleaner_source, fg_color="transparent")
+        self.frame_cleaner_hashes.grid(row=1, column=0, columnspan=3, pady=(10, 0), sticky="ew")
+
+        self.shortlist_dict = {
+            self.t("hash_off"): None,
+            "aHash": "ahash",
+            "dHash": "dhash"
+        }
+        ctk.CTkLabel(self.frame_cleaner_hashes, text=self.t("hash_shortlist")).pack(side="left", padx=(0, 5))
+        self.option_shortlist = ctk.CTkOptionMenu(self.frame_cleaner_hashes, values=list(self.shortlist_dict.keys()), width=100)
+        self.option_shortlist.set("dHash")
+        self.option_shortlist.pack(side="left", padx=(0, 5))
+        self.entry_shortlist_threshold = ctk.CTkEntry(self.frame_cleaner_hashes, width=50)
+        self.entry_shortlist_threshold.insert(0, "10")
+        self.entry_shortlist_threshold.pack(side="left", padx=(0, 20))
+
+        self.confirm_dict = {
+            "pHash": "phash",
+            "wHash": "whash",
+            "Color": "colorhash"
+        }
+        ctk.CTkLabel(self.frame_cleaner_hashes, text=self.t("hash_confirm")).pack(side="left", padx=(0, 5))
+        self.option_confirm = ctk.CTkOptionMenu(self.frame_cleaner_hashes, values=list(self.confirm_dict.keys()), width=100)
+        self.option_confirm.set("pHash")
+        self.option_confirm.pack(side="left", padx=(0, 5))
+        ctk.CTkLabel(self.frame_cleaner_hashes, text=self.t("hash_threshold")).pack(side="left", padx=(0, 5))
+        self.entry_confirm_threshold = ctk.CTkEntry(self.frame_cleaner_hashes, width=50)
+        self.entry_confirm_threshold.insert(0, "5")
+        self.entry_confirm_threshold.pack(side="left")
+
         # 2. Progress Bar (The "Red Line" area)
         self.cleaner_progress_container = ctk.CTkFrame(self.tab_cleaner, fg_color="transparent")
         self.cleaner_progress = ctk.CTkProgressBar(self.cleaner_progress_container, height=12)
@@ -351,6 +487,16 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
                                                 height=35, state="disabled")
         self.btn_delete_selected.pack(side="right", padx=0, pady=5)
 
+        # Pager: only RESULTS_PER_PAGE groups are turned into widgets at a time
+        self.btn_next_page = ctk.CTkButton(self.frame_cleaner_actions, text=">", width=35, height=35,
+                                           command=lambda: self.show_result_page(self.result_page + 1))
+        self.btn_next_page.pack(side="right", padx=(5, 20), pady=5)
+        self.lbl_page = ctk.CTkLabel(self.frame_cleaner_actions, text="")
+        self.lbl_page.pack(side="right", padx=5, pady=5)
+        self.btn_prev_page = ctk.CTkButton(self.frame_cleaner_actions, text="<", width=35, height=35,
+                                           command=lambda: self.show_result_page(self.result_page - 1))
+        self.btn_prev_page.pack(side="right", padx=5, pady=5)
+
         # 4. Results
         self.frame_results = ctk.CTkScrollableFrame(self.tab_cleaner)
         self.frame_results.grid(row=3, column=0, padx=20, pady=10, sticky="nsew")
@@ -509,25 +655,94 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         else:
             self.btn_toggle.configure(state="disabled", fg_color="gray")
 
+    def drain_ui_events(self):
+        try:
+            self.ui_events.drain()
+        finally:
+            self.after(UI_POLL_MS, self.drain_ui_events)
+
+    def start_run_logs(self, *names):
+        for name in names:
+            self.log_paths[name] = start_run_log(self.file_logs[name], name)
+
+    def append_lines(self, textbox, name, lines, dropped):
+        """One insert for a whole batch of log lines, then trim the widget to MAX_LOG_LINES."""
+        if dropped:
+            lines = [self.t("log_dropped").format(dropped)] + lines
+        textbox.configure(state="normal")
+        textbox.insert("end", "\n".join(lines) + "\n")
+
+        # Ring buffer: the first line becomes a pointer to the full log, the oldest lines after it go
+        line_count = int(textbox.index("end-1c").split(".")[0]) - 1 # the text ends with a newline
+        if line_count > MAX_LOG_LINES:
+            note = self.t("log_truncated").format(MAX_LOG_LINES, self.log_paths.get(name, LOG_DIR))
+            if textbox.get("1.0", "1.end") != note:
+                textbox.insert("1.0", note + "\n")
+                line_count += 1
+            textbox.delete("2.0", f"{line_count - MAX_LOG_LINES + 1}.0")
+
+        textbox.see("end")
+        textbox.configure(state="disabled")
+
+    def write_resizer_log(self, lines, dropped):
+        self.append_lines(self.textbox_log, "resizer", lines, dropped)
+
+    def write_skipped_log(self, lines, dropped):
+        self.append_lines(self.textbox_skipped, "skipped", lines, dropped)
+
+    def write_cleaner_log(self, lines, dropped):
+        self.append_lines(self.cleaner_log, "cleaner", lines, dropped)
+
     def log_resizer(self, message):
-        self.textbox_log.configure(state="normal")
-        self.textbox_log.insert("end", message + "\n")
-        self.textbox_log.see("end")
-        self.textbox_log.configure(state="disabled")
+        # Safe from any thread, see drain_ui_events
+        self.file_logs["resizer"].info(message)
+        self.ui_events.add_line(self.write_resizer_log, message)
 
     def log_skipped(self, filename, reason):
-        self.textbox_skipped.configure(state="normal")
-        
         # Translate reason if possible
         translated_reason = reason
         if reason == "vertical":
             translated_reason = self.t("skipped_vertical")
         elif reason == "horizontal":
             translated_reason = self.t("skipped_horizontal")
+        elif reason == "unchanged":
+            translated_reason = self.t("skipped_unchanged")
+        elif reason == "copied":
+            translated_reason = self.t("skipped_copied")
             
-        self.textbox_skipped.insert("end", f"{filename}: {translated_reason}\n")
-        self.textbox_skipped.see("end")
-        self.textbox_skipped.configure(state="disabled")
+        self.file_logs["skipped"].info(f"{filename}: {reason}")
+        self.ui_events.add_line(self.write_skipped_log, f"{filename}: {translated_reason}")
+
+    def set_resizer_progress(self, value):
+        self.ui_events.set_value(self.progress_bar.set, value)
+
+    def update_run_status(self, record):
+        # stats_callback, runs on the worker thread; the label is updated on the Tk thread
+        stats = self.resizer.stats
+        images_per_second, megabytes_per_second = stats.throughput()
+        text = f"{images_per_second:.1f} img/s · {megabytes_per_second:.1f} MB/s"
+        remaining = self.run_plan.remaining_seconds(stats) if self.run_plan else None
+        if remaining is not None:
+            text += f" · ETA {format_duration(remaining)}"
+        self.ui_events.set_value(self.set_run_status, text)
+
+    def set_run_status(self, text):
+        self.lbl_run_status.configure(text=text)
+
+    def ask_on_ui(self, ask, *args):
+        """Runs a message box on the Tk thread and waits for its answer (worker threads only)."""
+        answer = {}
+        answered = threading.Event()
+
+        def run():
+            try:
+                answer["value"] = ask(*args)
+            finally:
+                answered.set()
+
+        self.ui_events.call(run)
+        answered.wait()
+        return answer.get("value")
 
     def toggle_process(self):
         if self.is_running:
@@ -548,6 +763,8 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         start_btn_width = total_width
         
         if direction == "start":
+            self.lbl_run_status.configure(text="")
+            self.lbl_run_status.pack(side="left", padx=(0, 10), pady=10)
             self.progress_bar.pack(side="left", padx=(0, 15), pady=10, expand=True, fill="x")
             self.btn_toggle.pack_configure(expand=False, fill="none")
             self._step_animate(0, start_btn_width, target_btn_width)
@@ -567,6 +784,7 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
             self.after(self.anim_delay, lambda: self._step_animate(current_step + 1, start_w, end_w, is_reverting))
         elif is_reverting:
             self.progress_bar.pack_forget()
+            self.lbl_run_status.pack_forget()
             self.btn_toggle.pack_configure(expand=True, fill="x")
             self.btn_toggle.configure(width=140)
 
@@ -593,6 +811,7 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         
         self.animate_action_section("start")
         self.progress_bar.set(0)
+        self.start_run_logs("resizer", "skipped")
         
         self.textbox_log.configure(state="normal")
         self.textbox_log.delete("0.0", "end")
@@ -614,40 +833,65 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
             'skip_vertical': self.check_skip_vertical.get(),
             'skip_horizontal': self.check_skip_horizontal.get(),
             'keep_structure': self.check_keep_structure.get(),
-            'output_format': self.option_format.get()
+            'incremental': self.check_incremental.get(),
+            'output_format': self.option_format.get(),
+            'speed': self.speeds_dict.get(self.option_speed.get(), "quality"),
+            'encoder_profile': self.profiles_dict.get(self.option_profile.get(), "balanced")
         }
-        thread = threading.Thread(target=self.run_resizer_thread, args=(params,))
+        thread = threading.Thread(target=self.run_resizer_thread, args=(params, self.check_plan.get()))
         thread.start()
 
     def cancel_resizer(self):
         self.resizer.stop()
         self.log_resizer(self.t("stopping"))
 
-    def run_resizer_thread(self, params):
+    def run_resizer_thread(self, params, plan=False):
+        self.run_plan = None
         try:
+            if plan:
+                # Pre-flight: headers only plus a few samples, for the ETA and a disk space check
+                self.log_resizer(self.t("planning"))
+                self.run_plan = plan_resize(self.resizer_source_dir, self.resizer_dest_dir, params,
+                                            stop_event=self.resizer.stop_event)
+                for line in self.run_plan.summary():
+                    self.log_resizer(line)
+                if self.resizer.stop_event.is_set():
+                    self.log_resizer(self.t("cancelled"))
+                    return
+                if not self.run_plan.enough_space and not self.ask_on_ui(messagebox.askyesno, "Warning", self.t("low_space")):
+                    self.log_resizer(self.t("cancelled"))
+                    return
+
             success_count, skipped_count = self.resizer.resize_images(
                 self.resizer_source_dir, 
                 self.resizer_dest_dir, 
                 params, 
-                progress_callback=self.progress_bar.set,
+                progress_callback=self.set_resizer_progress,
                 log_callback=self.log_resizer,
-                skip_callback=self.log_skipped
+                skip_callback=self.log_skipped,
+                stats_callback=self.update_run_status
             )
             if not self.resizer.stop_event.is_set():
                 self.log_resizer("\n" + self.t("completed_count").format(success_count))
+                for line in self.resizer.stats.summary():
+                    self.log_resizer(line)
                 self.log_resizer(self.t("completed"))
-                messagebox.showinfo(self.t("done_title"), self.t("completed_count").format(success_count))
+                self.ui_events.call(messagebox.showinfo, self.t("done_title"),
+                                    self.t("completed_count").format(success_count))
             else:
                 self.log_resizer(self.t("cancelled"))
         except Exception as e:
             self.log_resizer(f"Error: {e}")
-            messagebox.showerror("Error", str(e))
+            self.ui_events.call(messagebox.showerror, "Error", str(e))
         finally:
-            self.is_running = False
-            self.btn_toggle.configure(text="🚀 " + self.t("start_resizing"), fg_color="green")
-            self.animate_action_section("end")
-            self.toggle_resizer_ui("normal")
-            self.validate_inputs()
+            self.ui_events.call(self.finish_resizer)
+
+    def finish_resizer(self):
+        self.is_running = False
+        self.btn_toggle.configure(text="🚀 " + self.t("start_resizing"), fg_color="green")
+        self.animate_action_section("end")
+        self.toggle_resizer_ui("normal")
+        self.validate_inputs()
 
     def toggle_resizer_ui(self, state):
         self.btn_source.configure(state=state)
@@ -665,10 +909,8 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
             self.validate_cleaner_inputs()
 
     def log_cleaner(self, message):
-        self.cleaner_log.configure(state="normal")
-        self.cleaner_log.insert("end", message + "\n")
-        self.cleaner_log.see("end")
-        self.cleaner_log.configure(state="disabled")
+        self.file_logs["cleaner"].info(message)
+        self.ui_events.add_line(self.write_cleaner_log, message)
 
     def start_scan(self):
         self.cleaner_source_dir = self.entry_cleaner_source.get()
@@ -676,6 +918,16 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
             messagebox.showerror("Error", self.t("error_select_dirs"))
             return
 
+        try:
+            self.cleaner_cascade = [(self.confirm_dict[self.option_confirm.get()],
+                                     int(self.entry_confirm_threshold.get()))]
+            shortlist = self.shortlist_dict[self.option_shortlist.get()]
+            if shortlist:
+                self.cleaner_cascade.insert(0, (shortlist, int(self.entry_shortlist_threshold.get())))
+        except ValueError:
+            messagebox.showerror("Error", self.t("error_threshold"))
+            return
+
         self.btn_scan.configure(state="disabled")
         self.cleaner_progress_container.grid(row=1, column=0, sticky="ew")
         self.cleaner_progress.set(0)
@@ -683,15 +935,16 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         # Hide actions frame during scan if it was visible
         self.frame_cleaner_actions.grid_forget()
         
+        self.start_run_logs("cleaner")
         self.cleaner_log.configure(state="normal")
         self.cleaner_log.delete("0.0", "end")
         self.cleaner_log.configure(state="disabled")
         self.log_cleaner(self.t("starting"))
         
-        for widget in self.frame_results.winfo_children():
-            widget.destroy()
+        self.clear_result_widgets()
         self.frame_results.configure(label_text="") # Reset header
-        self.check_vars.clear()
+        self.selected_files.clear()
+        self.result_page = 0
 
         self.cleaner.stop_event.clear()
         thread = threading.Thread(target=self.run_scan_thread)
@@ -701,20 +954,28 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         try:
             duplicates = self.cleaner.find_duplicates(
                 self.cleaner_source_dir, 
-                progress_callback=self.cleaner_progress.set,
-                log_callback=self.log_cleaner
+                progress_callback=lambda value: self.ui_events.set_value(self.cleaner_progress.set, value),
+                log_callback=self.log_cleaner,
+                cascade=self.cleaner_cascade
             )
-            self.duplicates = duplicates
-            self.after(0, self.display_duplicates)
+            self.ui_events.call(self.show_scan_results, duplicates)
             self.log_cleaner(self.t("scan_complete").format(len(duplicates)))
         except Exception as e:
             self.log_cleaner(f"Error: {e}")
         finally:
-            self.btn_scan.configure(state="normal")
-            self.after(0, lambda: self.cleaner_progress_container.grid_forget())
+            self.ui_events.call(self.finish_scan)
+
+    def show_scan_results(self, duplicates):
+        self.duplicates = duplicates
+        self.display_duplicates()
+
+    def finish_scan(self):
+        self.btn_scan.configure(state="normal")
+        self.cleaner_progress_container.grid_forget()
 
     def display_duplicates(self):
         if not self.duplicates:
+            self.clear_result_widgets()
             self.frame_results.configure(label_text="")
             lbl = ctk.CTkLabel(self.frame_results, text=self.t("no_duplicates"))
             lbl.pack(pady=10)
@@ -723,8 +984,26 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         # Show header and actions frame now that scan is done and duplicates found
         self.frame_results.configure(label_text=self.t("duplicates_found"))
         self.frame_cleaner_actions.grid(row=2, column=0, padx=25, pady=(0, 5), sticky="ew")
+        self.show_result_page(self.result_page)
 
-        for i, group in enumerate(self.duplicates):
+    def clear_result_widgets(self):
+        for widget in self.frame_results.winfo_children():
+            widget.destroy()
+        self.page_checkboxes.clear()
+        self.page_thumbnails.clear()
+        # Previews still queued for the old page aren't needed anymore
+        self.thumbnails.cancel_pending()
+        self.page_generation += 1
+
+    def show_result_page(self, page):
+        """Creates widgets for one page of groups only, so huge results stay responsive."""
+        pages = max(1, -(-len(self.duplicates) // RESULTS_PER_PAGE))
+        self.result_page = min(max(page, 0), pages - 1)
+        self.clear_result_widgets()
+
+        first = self.result_page * RESULTS_PER_PAGE
+        for i in range(first, min(first + RESULTS_PER_PAGE, len(self.duplicates))):
+            group = self.duplicates[i]
             frame_group = ctk.CTkFrame(self.frame_results)
             frame_group.pack(fill="x", padx=5, pady=5)
             
@@ -734,19 +1013,65 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
             for file_path in group:
                 frame_file = ctk.CTkFrame(frame_group)
                 frame_file.pack(fill="x", padx=10, pady=2)
+
+                lbl_thumb = ctk.CTkLabel(frame_file, text="", width=64, height=64)
+                lbl_thumb.pack(side="left", padx=5, pady=2)
+                self.page_thumbnails[file_path] = lbl_thumb
+                self.thumbnails.request(file_path, lambda p, img, g=self.page_generation:
+                                        self.ui_events.call(self.show_thumbnail, g, p, img))
                 
-                var = ctk.BooleanVar()
-                var.trace_add("write", lambda *args: self.update_selection_states())
-                self.check_vars[file_path] = var
-                
-                chk = ctk.CTkCheckBox(frame_file, text=os.path.basename(file_path), variable=var)
+                chk = ctk.CTkCheckBox(frame_file, text=os.path.basename(file_path),
+                                      command=lambda p=file_path: self.toggle_file(p))
+                if file_path in self.selected_files:
+                    chk.select()
                 chk.pack(side="left", padx=5, pady=2)
-        
+                self.page_checkboxes[file_path] = chk
+
+        self.lbl_page.configure(text=f"{self.result_page + 1} / {pages}")
+        self.btn_prev_page.configure(state="normal" if self.result_page > 0 else "disabled")
+        self.btn_next_page.configure(state="normal" if self.result_page < pages - 1 else "disabled")
+        self.frame_results._parent_canvas.yview_moveto(0)
+        self.update_selection_states()
+
+    def show_thumbnail(self, generation, file_path, image):
+        # Runs on the Tk thread; results for a page that is gone are dropped
+        if generation != self.page_generation or image is None:
+            return
+        lbl_thumb = self.page_thumbnails.get(file_path)
+        if lbl_thumb:
+            lbl_thumb.configure(image=ctk.CTkImage(light_image=image, dark_image=image, size=image.size))
+
+    def toggle_file(self, file_path):
+        if self.page_checkboxes[file_path].get():
+            self.selected_files.add(file_path)
+        else:
+            self.selected_files.discard(file_path)
+        self.update_selection_states()
+
+    def refresh_checkboxes(self):
+        """Syncs the visible checkboxes with self.selected_files."""
+        for file_path, chk in self.page_checkboxes.items():
+            if file_path in self.selected_files:
+                chk.select()
+            else:
+                chk.deselect()
+        self.update_selection_states()
+
+    def update_duplicate_groups(self, changes):
+        """Applies ImageCleaner.remove_files results; only the visible page is rebuilt."""
+        self.duplicates = self.cleaner.groups
+        listed = {path for group in self.duplicates for path in group}
+        self.selected_files &= listed
+
+        if not self.duplicates:
+            self.frame_cleaner_actions.grid_forget()
+            self.display_duplicates()
+        elif changes:
+            self.show_result_page(self.result_page)
         self.update_selection_states()
 
     def update_selection_states(self):
-        any_selected = any(var.get() for var in self.check_vars.values())
-        if any_selected:
+        if self.selected_files:
             self.btn_deselect_all.configure(state="normal")
             self.btn_delete_selected.configure(state="normal")
         else:
@@ -754,25 +1079,20 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
             self.btn_delete_selected.configure(state="disabled")
 
     def select_all_duplicates(self):
-        for var in self.check_vars.values():
-            var.set(True)
+        self.selected_files = {path for group in self.duplicates for path in group}
+        self.refresh_checkboxes()
 
     def deselect_all_duplicates(self):
-        for var in self.check_vars.values():
-            var.set(False)
+        self.selected_files.clear()
+        self.refresh_checkboxes()
 
     def select_others_keep_one(self):
         """Keeping the first image of each group, selecting others for deletion."""
-        for group in self.duplicates:
-            if len(group) > 1:
-                # First one
-                self.check_vars[group[0]].set(False)
-                # Others
-                for i in range(1, len(group)):
-                    self.check_vars[group[i]].set(True)
+        self.selected_files = {path for group in self.duplicates for path in group[1:]}
+        self.refresh_checkboxes()
 
     def delete_selected_duplicates(self):
-        selected_files = [path for path, var in self.check_vars.items() if var.get()]
+        selected_files = sorted(self.selected_files)
         if not selected_files:
             messagebox.showinfo("Info", "No files selected.")
             return
@@ -780,18 +1100,22 @@ class App(ctk.CTk, TkinterDnD.DnDWrapper):
         if not messagebox.askyesno("Confirm Delete", self.t("confirm_delete").format(len(selected_files))):
             return
 
-        deleted_count = 0
+        deleted = []
         for path in selected_files:
             try:
                 os.remove(path)
                 self.log_cleaner(self.t("deleted").format(path))
-                deleted_count += 1
+                deleted.append(path)
             except Exception as e:
                 self.log_cleaner(f"Error deleting {path}: {e}")
         
-        messagebox.showinfo(self.t("done_title"), self.t("deleted").format(deleted_count))
-        self.start_scan()
+        # No rescan: drop the deleted files from the results and update their groups
+        self.thumbnails.discard(deleted)
+        self.update_duplicate_groups(self.cleaner.remove_files(deleted))
+        messagebox.showinfo(self.t("done_title"), self.t("deleted").format(len(deleted)))
 
 if __name__ == "__main__":
+    # Required for the resizer's worker processes in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     app = App()
     app.mainloop()
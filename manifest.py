@@ -0,0 +1,100 @@
+import os
+import json
+import hashlib
+import time
+
+MANIFEST_FILE = ".imageresizer_manifest.json"
+
+# Params that change how a run is executed but not what it writes
+RUNTIME_PARAMS = ('workers', 'incremental', 'profile', 'schedule', 'pixel_budget')
+
+# What process_image assumes for params that are left out. Filled in before hashing,
+# so a GUI run (which omits some of them) and a CLI run (which passes them all) with
+# the same settings agree on what is up to date.
+PARAM_DEFAULTS = {
+    'quality': 95,
+    'output_format': 'Original',
+    'keep_structure': True,
+    'no_enlarge': False,
+    'skip_vertical': False,
+    'skip_horizontal': False,
+    'speed': 'quality',
+    'encoder_profile': 'balanced',
+    'lossless': False,
+    'passthrough': 'reflink',
+}
+
+# Flush to disk at least this often so a crash or cancel loses little work
+SAVE_INTERVAL = 5.0
+
+
+def params_fingerprint(params):
+    """
+    Returns a short hash of the output-affecting resize params.
+    """
+    relevant = dict(PARAM_DEFAULTS)
+    relevant.update((k, v) for k, v in params.items() if k not in RUNTIME_PARAMS)
+    for key, default in PARAM_DEFAULTS.items():
+        if isinstance(default, bool):
+            # Tk checkboxes give 0/1
+            relevant[key] = bool(relevant[key])
+    if relevant['passthrough'] != 'off':
+        # Links and copies all end up with the source bytes
+        relevant['passthrough'] = 'on'
+    data = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class ResizeManifest:
+    """
+    Records which source files have already been written to a destination folder,
+    so re-runs (and runs resumed after a cancel) only process new or changed images.
+    Entries are keyed by absolute source path and store size, mtime, params hash
+    and the output files that were written.
+    """
+    def __init__(self, dest_dir, params):
+        self.path = os.path.join(dest_dir, MANIFEST_FILE)
+        self.fingerprint = params_fingerprint(params)
+        self.entries = {}
+        self.dirty = False
+        self.last_save = time.monotonic()
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("files", {})
+            except (OSError, ValueError):
+                # A damaged manifest only costs a full re-run
+                self.entries = {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": self.entries}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+        self.last_save = time.monotonic()
+
+    def is_up_to_date(self, source_path, stat):
+        entry = self.entries.get(os.path.abspath(source_path))
+        if entry is None:
+            return False
+        return (entry["size"] == stat.st_size
+                and entry["mtime"] == stat.st_mtime_ns
+                and entry["params"] == self.fingerprint
+                and all(os.path.exists(p) for p in entry["outputs"]))
+
+    def record(self, source_path, stat, output_paths):
+        self.entries[os.path.abspath(source_path)] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "params": self.fingerprint,
+            "outputs": [os.path.abspath(p) for p in output_paths],
+        }
+        self.dirty = True
+        if time.monotonic() - self.last_save >= SAVE_INTERVAL:
+            self.save()
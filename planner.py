@@ -0,0 +1,223 @@
+import os
+import time
+import shutil
+import tempfile
+from PIL import Image
+from manifest import ResizeManifest
+from resizer import IMAGE_EXTENSIONS, STRIP_THRESHOLD, compute_target_size, get_renditions, process_image, can_pass_through
+
+# Files actually resized (into a temp folder) to measure speed and output size. They
+# are taken around the median size and never above resizer.STRIP_THRESHOLD, so
+# calibrating stays cheap next to the run itself; the result is scaled per megapixel.
+CALIBRATION_SAMPLES = 5
+
+# Free space wanted on the destination volume on top of the estimated output
+DISK_MARGIN = 1.2
+
+
+class ResizePlan:
+    """
+    What a resize run is going to do, from image headers plus a few sample files:
+    file and pixel totals, estimated duration and output size, and free disk space.
+    Estimates are rough: they assume time scales with the pixels read plus the pixels
+    written, and output size with output pixels (per output format).
+    """
+    def __init__(self):
+        self.files = 0
+        self.skipped = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.copies = 0  # images that will be copied/linked as they are (see resizer.pass_through)
+        self.copy_bytes = 0
+        self.source_pixels = 0
+        self.output_pixels = {}  # image format -> pixels written
+        self.seconds_per_megapixel = None  # per megapixel read plus written
+        self.bytes_per_pixel = {}  # image format -> bytes per output pixel
+        self.workers = 1
+        self.free_bytes = None
+
+    @property
+    def work_pixels(self):
+        return self.source_pixels + sum(self.output_pixels.values())
+
+    @property
+    def estimated_seconds(self):
+        if self.seconds_per_megapixel is None:
+            return None
+        return self.work_pixels / 1e6 * self.seconds_per_megapixel / self.workers
+
+    @property
+    def estimated_bytes(self):
+        if not self.bytes_per_pixel:
+            return self.copy_bytes if not self.output_pixels else None
+        fallback = sum(self.bytes_per_pixel.values()) / len(self.bytes_per_pixel)
+        return self.copy_bytes + int(sum(pixels * self.bytes_per_pixel.get(image_format, fallback)
+                                         for image_format, pixels in self.output_pixels.items()))
+
+    @property
+    def enough_space(self):
+        if self.free_bytes is None or self.estimated_bytes is None:
+            return True
+        # Hardlinks and reflinks take (almost) no space, but they may fall back to copies
+        return self.free_bytes >= self.estimated_bytes * DISK_MARGIN
+
+    def remaining_seconds(self, stats):
+        """
+        ETA during the run, from the throughput measured so far (a ResizeStats).
+        """
+        elapsed = stats.elapsed
+        done = stats.pixels + stats.output_pixels
+        if done and elapsed > 0:
+            return max(self.work_pixels - done, 0) / (done / elapsed)
+        if self.estimated_seconds is not None:
+            return max(self.estimated_seconds - elapsed, 0)
+        return None
+
+    def to_dict(self):
+        return {
+            'files': self.files,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'bytes_in': self.bytes_in,
+            'copies': self.copies,
+            'source_megapixels': round(self.source_pixels / 1e6, 1),
+            'workers': self.workers,
+            'estimated_seconds': None if self.estimated_seconds is None else round(self.estimated_seconds, 1),
+            'estimated_bytes_out': self.estimated_bytes,
+            'free_bytes': self.free_bytes,
+            'enough_space': self.enough_space,
+        }
+
+    def summary(self):
+        """
+        Returns a few human readable lines for the log.
+        """
+        lines = [f"Plan: {self.files} images, {self.source_pixels / 1e6:.0f} MP, "
+                 f"{self.bytes_in / 1048576:.1f} MB in"
+                 + (f", {self.copies} copied as is" if self.copies else "")
+                 + (f", {self.skipped} skipped" if self.skipped else "")
+                 + (f", {self.errors} unreadable" if self.errors else "")]
+        if self.estimated_seconds is not None:
+            lines.append(f"Estimated time: {format_duration(self.estimated_seconds)} with {self.workers} workers")
+        if self.estimated_bytes is not None:
+            line = f"Estimated output: {self.estimated_bytes / 1048576:.1f} MB"
+            if self.free_bytes is not None:
+                line += f", {self.free_bytes / 1048576:.0f} MB free"
+            lines.append(line)
+        if not self.enough_space:
+            lines.append("Warning: the destination may run out of space")
+        return lines
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def plan_resize(source_dir, dest_dir, params, samples=CALIBRATION_SAMPLES, stop_event=None):
+    """
+    Reads only the headers of every image below source_dir, computes their target
+    sizes like process_image does, and resizes a few samples into a temp folder to
+    calibrate time per megapixel and bytes per output pixel. Nothing is written
+    to dest_dir. Returns a ResizePlan.
+    """
+    plan = ResizePlan()
+    # More workers than cores don't make it any faster
+    cores = os.cpu_count() or 1
+    plan.workers = 1 if params.get('profile') else max(1, min(params.get('workers') or cores, cores))
+    manifest = ResizeManifest(dest_dir, params) if params.get('incremental') else None
+    extensions = Image.registered_extensions()
+
+    candidates = []  # (work pixels, source pixels, source_path, dest_path)
+    for root, dirs, files in os.walk(source_dir):
+        if stop_event is not None and stop_event.is_set():
+            break
+        for file in files:
+            if not file.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            source_path = os.path.join(root, file)
+            dest_path = os.path.join(dest_dir, os.path.relpath(source_path, source_dir))
+            try:
+                stat = os.stat(source_path)
+                if manifest is not None and manifest.is_up_to_date(source_path, stat):
+                    plan.skipped += 1
+                    continue
+                with Image.open(source_path) as img:
+                    width, height = img.size
+                    renditions = get_renditions(dest_path, params, dest_dir)
+                    first_size = compute_target_size(width, height, renditions[0][0])
+                    copy = can_pass_through(img, first_size, renditions[0][1], params)
+            except Exception:
+                plan.errors += 1
+                continue
+
+            if (params.get('skip_vertical') and height > width) or (params.get('skip_horizontal') and width > height):
+                plan.skipped += 1
+                continue
+
+            plan.files += 1
+            plan.bytes_in += stat.st_size
+            if copy:
+                plan.copies += 1
+                plan.copy_bytes += stat.st_size
+                continue
+            plan.source_pixels += width * height
+            work = width * height
+            for rendition_params, output_path in renditions:
+                new_width, new_height = compute_target_size(width, height, rendition_params)
+                image_format = extensions.get(os.path.splitext(output_path)[1].lower())
+                plan.output_pixels[image_format] = plan.output_pixels.get(image_format, 0) + new_width * new_height
+                work += new_width * new_height
+            candidates.append((work, width * height, source_path, dest_path))
+
+    if candidates and samples:
+        _calibrate(plan, candidates, params, samples, extensions)
+    plan.free_bytes = _free_space(dest_dir)
+    return plan
+
+
+def _calibrate(plan, candidates, params, samples, extensions):
+    candidates = sorted(c for c in candidates if c[1] <= params.get('strip_threshold', STRIP_THRESHOLD))
+    middle = max(0, len(candidates) // 2 - samples // 2)
+    picked = candidates[middle:middle + samples]
+
+    sample_params = {k: v for k, v in params.items() if k not in ('incremental', 'profile')}
+    seconds = pixels = 0
+    written = {}  # image format -> (bytes, pixels)
+    with tempfile.TemporaryDirectory(prefix="imageresizer_plan_") as temp_dir:
+        for n, (work, _, source_path, _) in enumerate(picked):
+            dest_path = os.path.join(temp_dir, str(n), os.path.basename(source_path))
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            started = time.perf_counter()
+            try:
+                status, _, _ = process_image(source_path, dest_path, sample_params, temp_dir)
+            except Exception:
+                continue
+            if status != "success":
+                continue
+            seconds += time.perf_counter() - started
+            pixels += work
+
+            for _, output_path in get_renditions(dest_path, sample_params, temp_dir):
+                with Image.open(output_path) as img:
+                    output_pixels = img.width * img.height
+                image_format = extensions.get(os.path.splitext(output_path)[1].lower())
+                size, area = written.get(image_format, (0, 0))
+                written[image_format] = (size + os.path.getsize(output_path), area + output_pixels)
+
+    if pixels:
+        plan.seconds_per_megapixel = seconds / (pixels / 1e6)
+    plan.bytes_per_pixel = {image_format: size / area for image_format, (size, area) in written.items() if area}
+
+
+def _free_space(path):
+    # dest_dir may not exist yet; check the volume of its closest existing parent
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+    return shutil.disk_usage(path).free
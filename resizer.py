@@ -1,38 +1,356 @@
 import os
+import shutil
 from PIL import Image
 import threading
+import queue
+import io
+import time
+import cProfile
+import heapq
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+from imaging import IMAGE_EXTENSIONS, init_worker, can_reduce
+from manifest import ResizeManifest
+from stats import ResizeStats, StageTimer
+
+# Paths are cheap, so discovery may run well ahead of the workers; this keeps the
+# progress total close to the real one early in the run.
+DISCOVERY_QUEUE_SIZE = 10000
+
+# With params['schedule'] == 'largest' (the default), up to this many discovered images
+# are held back and handed to the pool biggest first, so a few huge files found late
+# don't leave all but one worker idle at the end of the run. 'walk' keeps walk order.
+SCHEDULE_WINDOW = 2000
+SCHEDULES = ('largest', 'walk')
+
+# The window fills up while the pool works: dispatching starts once this many images
+# per worker have been probed, and more are probed PROBE_BATCH at a time whenever all
+# workers are busy, so reading headers on a slow share doesn't hold up the first images.
+SCHEDULE_START_PER_WORKER = 2
+PROBE_BATCH = 32
+
+# params['speed'] -> (JPEG draft scale, resize reducing_gap)
+# 'quality' decodes at full resolution; the others decode JPEGs at a reduced size
+# (draft scale x target) and pre-shrink with reduce() before the LANCZOS pass.
+SPEED_PRESETS = {
+    'quality': (None, None),
+    'balanced': (2, 3.0),
+    'fast': (1, 2.0),
+}
+
+# params['encoder_profile'] -> per-format save() options, trading encode time for size.
+# 'balanced' is the default and is exactly Pillow's defaults (what save() did before
+# profiles existed). JPEG 'subsampling' is chroma subsampling; 4:2:0 halves the colour
+# resolution both ways, which is also what libjpeg does by default.
+ENCODER_PROFILES = {
+    'fastest': {
+        'JPEG': {'subsampling': '4:2:0'},
+        'PNG': {'compress_level': 1},
+        'WEBP': {'method': 0},
+    },
+    'balanced': {
+        'JPEG': {},
+        'PNG': {'compress_level': 6},
+        'WEBP': {'method': 4},
+    },
+    'smallest': {
+        'JPEG': {'optimize': True, 'progressive': True, 'subsampling': '4:2:0'},
+        'PNG': {'compress_level': 9, 'optimize': True},
+        'WEBP': {'method': 6},
+    },
+}
+
+# params['passthrough']: how images that need no resampling are written when the output
+# format is 'Original' (an explicit format means the user wants that encoder's settings).
+# 'reflink' (default) clones the file copy-on-write where the filesystem supports it,
+# 'hardlink' links it (output and source then share their bytes), 'copy' copies; all
+# fall back to a plain copy. 'off' always decodes and re-encodes.
+PASSTHROUGH_METHODS = ('reflink', 'hardlink', 'copy', 'off')
+FICLONE = 0x40049409  # Linux ioctl behind `cp --reflink`
+
+# Admission control: the sum of pixels held in memory by all workers at once (decoded
+# sources plus outputs, see probe_pixels).
+# An image bigger than the whole budget still runs, but alone.
+DEFAULT_PIXEL_BUDGET = 200_000_000
+
+# Images above this many pixels are never decoded in one piece when the file layout
+# allows it: uncompressed TIFF/BMP/PPM are read in bands of STRIP_BAND_PIXELS,
+# JPEGs are DCT-downscaled with draft(). Other formats fall back to a full decode.
+STRIP_THRESHOLD = 50_000_000
+STRIP_BAND_PIXELS = 16_000_000
+
+
+class PixelBudget:
+    """
+    Tracks how many pixels are in flight across the worker pool.
+    Only used from the dispatching thread, so no locking is needed.
+    """
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+
+    def fits(self, pixels):
+        return self.in_flight == 0 or self.in_flight + pixels <= self.limit
+
+    def acquire(self, pixels):
+        self.in_flight += pixels
+
+    def release(self, pixels):
+        self.in_flight -= pixels
 
-# Disable DecompressionBombError for large images
-Image.MAX_IMAGE_PIXELS = None
 
 class ImageResizer:
     def __init__(self):
         self.stop_event = threading.Event()
+        self.stats = None
 
-    def resize_images(self, source_dir, dest_dir, params, progress_callback=None, log_callback=None, skip_callback=None):
+    def resize_images(self, source_dir, dest_dir, params, progress_callback=None, log_callback=None, skip_callback=None,
+                      stats_callback=None):
         """
         Resizes images from source_dir to dest_dir based on params.
         params: dict with keys 'mode', 'value', 'keep_structure', etc.
+        'workers' sets the number of worker processes (default: CPU count, 1 = no pool).
+        'speed' is one of SPEED_PRESETS ('quality' by default).
+        'encoder_profile' is one of ENCODER_PROFILES ('balanced' by default) and
+        'lossless' switches WEBP output to lossless mode.
+        'incremental' skips images whose output in dest_dir is already up to date
+        (reported to skip_callback as "unchanged"); this also resumes cancelled runs.
+        'renditions' is an optional list of per-output param overrides (see get_renditions).
+        'pixel_budget' caps the pixels held in memory concurrently (DEFAULT_PIXEL_BUDGET) and
+        'strip_threshold' sets the size above which images are resized in strips.
+        'profile' is a path to write cProfile stats to; it forces workers=1 so the
+        profile covers the image work.
+        'schedule' is 'largest' (default, see SCHEDULE_WINDOW) or 'walk'.
+        'passthrough' is one of PASSTHROUGH_METHODS ('reflink' by default). Images
+        written that way count as processed and are reported to skip_callback as "copied".
+        Per-file timings are collected in self.stats (a ResizeStats) and each file's
+        record is passed to stats_callback.
+        Callbacks are always invoked from the calling thread.
         """
         if not os.path.exists(dest_dir):
             os.makedirs(dest_dir)
 
-        keep_structure = params.get('keep_structure', True)
+        workers = params.get('workers') or os.cpu_count() or 1
+        profiler = None
+        if params.get('profile'):
+            profiler = cProfile.Profile()
+            workers = 1
+        stats = self.stats = ResizeStats()
+        manifest = ResizeManifest(dest_dir, params) if params.get('incremental') else None
 
-        total_files = 0
-        for root, dirs, files in os.walk(source_dir):
-            for file in files:
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.webp')):
-                    total_files += 1
+        # Discovery runs in its own thread and streams jobs in, so processing starts
+        # with the first image instead of after a full counting walk.
+        jobs = queue.Queue(maxsize=DISCOVERY_QUEUE_SIZE)
+        discovery = {'found': 0, 'error': None}
+        finished = threading.Event()
+
+        def put_job(job):
+            while not finished.is_set() and not self.stop_event.is_set():
+                try:
+                    jobs.put(job, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def discover():
+            try:
+                walk = self._iter_jobs(source_dir, dest_dir, params)
+                while not self.stop_event.is_set():
+                    started = time.perf_counter()
+                    job = next(walk, None)
+                    stats.discovery_time += time.perf_counter() - started
+                    if job is None:
+                        break
+                    # Counted before queueing so the progress total never lags behind
+                    discovery['found'] += 1
+                    if not put_job(job):
+                        break
+            except Exception as e:
+                discovery['error'] = e
+            finally:
+                put_job(None)
+
+        counts = {'processed': 0, 'success': 0, 'skipped': 0}
+
+        def report(file, status, message, info=None):
+            record = stats.add(file, status, info)
+            if stats_callback:
+                stats_callback(record)
+
+            if status == "success":
+                counts['success'] += 1
+                if message and skip_callback:
+                    # Written without resizing (e.g. "copied"); listed with the skips
+                    skip_callback(file, message)
+                elif log_callback:
+                    log_callback(f"Processed: {file}")
+            else:
+                counts['skipped'] += 1
+                if skip_callback:
+                    skip_callback(file, message)
+
+            counts['processed'] += 1
+            if progress_callback:
+                # The total keeps growing until discovery is done
+                progress_callback(counts['processed'] / max(discovery['found'], 1))
+
+        def finish(job, status, message, info=None):
+            file, source_path, dest_path, stat = job
+            if manifest is not None and status == "success":
+                outputs = [output_path for _, output_path in get_renditions(dest_path, params, dest_dir)]
+                manifest.record(source_path, stat, outputs)
+            report(file, status, message, info)
+
+        def collect(future, job):
+            budget.release(costs.pop(future, 0))
+            try:
+                status, message, info = future.result()
+            except Exception as e:
+                status, message, info = "error", str(e), None
+            finish(job, status, message, info)
+
+        def collect_done():
+            for future in [f for f in pending if f.done()]:
+                collect(future, pending.pop(future))
+
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+        pending = {}
+        costs = {}
+        budget = PixelBudget(params.get('pixel_budget', DEFAULT_PIXEL_BUDGET))
+
+        if profiler is not None:
+            profiler.enable()
+        discovery_thread = threading.Thread(target=discover, daemon=True)
+        discovery_thread.start()
+
+        largest_first = executor is not None and params.get('schedule', 'largest') == 'largest'
+        # Only a few images per worker are in flight: a worker that finishes early
+        # takes the next biggest image instead of a backlog assigned up front
+        max_in_flight = workers + 1 if largest_first else workers * 2
+        ready = []  # heap of (key, order, cost, job)
+        order = 0
+
+        def prepare(job):
+            file, source_path, dest_path = job
+            stat = None
+            if manifest is not None:
+                try:
+                    stat = os.stat(source_path)
+                except OSError as e:
+                    report(file, "error", str(e))
+                    return None
+                if manifest.is_up_to_date(source_path, stat):
+                    report(file, "skipped", "unchanged")
+                    return None
+            job = (file, source_path, dest_path, stat)
+
+            pixels = cost = 0
+            if executor is not None:
+                # Header only; Image.open doesn't decode
+                try:
+                    pixels, cost = probe_pixels(source_path, params)
+                except Exception as e:
+                    finish(job, "error", str(e))
+                    return None
+            return (-pixels if largest_first else order), order, cost, job
+
+        try:
+            discovery_done = False
+            window = SCHEDULE_WINDOW if largest_first else 1
+            while not self.stop_event.is_set():
+                busy = executor is not None and len(pending) >= max_in_flight
+                # Take in what discovery found so far; only block when there's nothing to do
+                want = PROBE_BATCH if busy else max(1, workers * SCHEDULE_START_PER_WORKER - len(ready))
+                taken = 0
+                while not discovery_done and taken < want and len(ready) < window:
+                    try:
+                        job = jobs.get(timeout=0.1) if not ready else jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if job is None:
+                        discovery_done = True
+                        break
+                    entry = prepare(job)
+                    order += 1
+                    if entry is not None:
+                        heapq.heappush(ready, entry)
+
+                if busy:
+                    # Keep a small backlog per worker so cancelling stays responsive;
+                    # go on probing while there is more to take in, else wait for a worker
+                    more = taken == want and len(ready) < window
+                    done, _ = wait(pending, timeout=0 if more else 0.1, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future, pending.pop(future))
+                    continue
+
+                if not ready:
+                    if discovery_done:
+                        break
+                    collect_done()
+                    continue
+                _, _, cost, job = heapq.heappop(ready)
+                file, source_path, dest_path, stat = job
+
+                if executor is None:
+                    try:
+                        status, message, info = self._process_image(source_path, dest_path, params, dest_dir)
+                    except Exception as e:
+                        status, message, info = "error", str(e), None
+                    finish(job, status, message, info)
+                    continue
+
+                # Hold back images until enough of the pixel budget is free
+                while pending and not budget.fits(cost):
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future, pending.pop(future))
+
+                future = executor.submit(process_image, source_path, dest_path, params, dest_dir)
+                pending[future] = job
+                costs[future] = cost
+                budget.acquire(cost)
 
-        processed_count = 0
-        success_count = 0
-        skipped_count = 0
-        
-        for root, dirs, files in os.walk(source_dir):
             if self.stop_event.is_set():
-                break
-                
+                # Drop queued work; images already being encoded are allowed to finish
+                for future in list(pending):
+                    if future.cancel():
+                        del pending[future]
+                        budget.release(costs.pop(future))
+
+            for future in list(pending):
+                collect(future, pending.pop(future))
+        finally:
+            finished.set()
+            discovery_thread.join()
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            if manifest is not None:
+                manifest.save()
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(params['profile'])
+            stats.finish()
+
+        if discovery['error'] is not None:
+            raise discovery['error']
+
+        return counts['success'], counts['skipped']
+
+    def _iter_jobs(self, source_dir, dest_dir, params):
+        """
+        Walks source_dir lazily and yields (file, source_path, dest_path) for every image.
+        """
+        keep_structure = params.get('keep_structure', True)
+
+        for root, dirs, files in os.walk(source_dir):
             if keep_structure:
                 # Create corresponding structure in dest_dir
                 relative_path = os.path.relpath(root, source_dir)
@@ -40,106 +358,390 @@ class ImageResizer:
             else:
                 # Save everything directly in dest_dir
                 current_dest_dir = dest_dir
-            
-            if not os.path.exists(current_dest_dir):
-                os.makedirs(current_dest_dir)
+
+            # Renditions create their own folders below dest_dir
+            if not params.get('renditions') and not os.path.exists(current_dest_dir):
+                os.makedirs(current_dest_dir, exist_ok=True)
 
             for file in files:
-                if self.stop_event.is_set():
-                    break
-                    
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.webp')):
-                    source_path = os.path.join(root, file)
-                    dest_path = os.path.join(current_dest_dir, file)
-                    
-                    try:
-                        status, message = self._process_image(source_path, dest_path, params)
-                        if status == "success":
-                            success_count += 1
-                            if log_callback:
-                                log_callback(f"Processed: {file}")
-                        elif status == "skipped":
-                            skipped_count += 1
-                            if skip_callback:
-                                skip_callback(file, message)
-                    except Exception as e:
-                        skipped_count += 1
-                        if skip_callback:
-                            skip_callback(file, str(e))
-                    
-                    processed_count += 1
-                    if progress_callback:
-                        progress_callback(processed_count / total_files)
-        
-        return success_count, skipped_count
-
-    def _process_image(self, source_path, dest_path, params):
-        with Image.open(source_path) as img:
-            original_width, original_height = img.size
-            
-            if params.get('skip_vertical') and original_height > original_width:
-                return "skipped", "vertical"
-
-            if params.get('skip_horizontal') and original_width > original_height:
-                return "skipped", "horizontal"
-
-            new_width, new_height = original_width, original_height
-
-            mode = params.get('mode')
-            value = params.get('value')
-
-            if mode == 'percentage':
-                ratio = value / 100
-                new_width = int(original_width * ratio)
-                new_height = int(original_height * ratio)
-            elif mode == 'width':
-                ratio = value / original_width
-                new_width = int(value)
-                new_height = int(original_height * ratio)
-            elif mode == 'height':
-                ratio = value / original_height
-                new_height = int(value)
-                new_width = int(original_width * ratio)
-            elif mode == 'max':
-                # Resize so that max dimension is 'value', keeping aspect ratio
-                ratio = min(value / original_width, value / original_height)
-                new_width = int(original_width * ratio)
-                new_height = int(original_height * ratio)
-            elif mode == 'fit':
-                # Resize to fit within value[0] x value[1], keeping aspect ratio
-                max_w, max_h = value
-                ratio = min(max_w / original_width, max_h / original_height)
-                
-                if params.get('no_enlarge') and ratio > 1:
-                    ratio = 1
-                    
-                new_width = int(original_width * ratio)
-                new_height = int(original_height * ratio)
-
-            # High quality resampling
-            img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            quality = params.get('quality', 95)
-            output_format = params.get('output_format', 'Original')
-            
-            save_kwargs = {'quality': quality}
-            
-            if output_format != 'Original':
-                # Change extension
-                root, ext = os.path.splitext(dest_path)
-                dest_path = root + '.' + output_format.lower()
-                
-                # Handle format specific requirements
-                if output_format == 'JPG':
-                    if img_resized.mode in ('RGBA', 'P'):
-                        img_resized = img_resized.convert('RGB')
-                elif output_format == 'WEBP':
-                    save_kwargs['quality'] = quality # WebP also uses quality
-                elif output_format == 'PNG':
-                    save_kwargs.pop('quality', None) # PNG is lossless, doesn't use quality param in same way (uses compress_level)
-
-            img_resized.save(dest_path, **save_kwargs)
-            return "success", None
+                if file.lower().endswith(IMAGE_EXTENSIONS):
+                    yield file, os.path.join(root, file), os.path.join(current_dest_dir, file)
+
+    def _process_image(self, source_path, dest_path, params, dest_dir=None):
+        return process_image(source_path, dest_path, params, dest_dir)
 
     def stop(self):
         self.stop_event.set()
+
+
+def compute_target_size(original_width, original_height, params):
+    """
+    Returns the (width, height) an image of the given size is resized to for params.
+    """
+    new_width, new_height = original_width, original_height
+
+    mode = params.get('mode')
+    value = params.get('value')
+
+    if mode == 'percentage':
+        ratio = value / 100
+        new_width = int(original_width * ratio)
+        new_height = int(original_height * ratio)
+    elif mode == 'width':
+        ratio = value / original_width
+        new_width = int(value)
+        new_height = int(original_height * ratio)
+    elif mode == 'height':
+        ratio = value / original_height
+        new_height = int(value)
+        new_width = int(original_width * ratio)
+    elif mode == 'max':
+        # Resize so that max dimension is 'value', keeping aspect ratio
+        ratio = min(value / original_width, value / original_height)
+        new_width = int(original_width * ratio)
+        new_height = int(original_height * ratio)
+    elif mode == 'fit':
+        # Resize to fit within value[0] x value[1], keeping aspect ratio
+        max_w, max_h = value
+        ratio = min(max_w / original_width, max_h / original_height)
+
+        if params.get('no_enlarge') and ratio > 1:
+            ratio = 1
+
+        new_width = int(original_width * ratio)
+        new_height = int(original_height * ratio)
+
+    return new_width, new_height
+
+
+def can_resize_in_strips(img):
+    """
+    True if img is stored as uncompressed rows that can be read a band at a time.
+    """
+    if img.mode in ('1', 'P') or not img.tile:
+        return False
+    for tile in img.tile:
+        if tile[0] != 'raw':
+            return False
+    if len(img.tile) > 1:
+        return True
+    return _row_layout(img, img.tile[0]) is not None
+
+
+def _row_layout(img, tile):
+    """
+    Returns (stride, ystep) of a single raw tile, or None if it can't be split by rows.
+    """
+    args = tile[3]
+    if isinstance(args, str):
+        args = (args, 0, 1)
+    rawmode, stride, ystep = (tuple(args) + (0, 1))[:3]
+    if ystep not in (1, -1):
+        return None
+    if not stride:
+        if rawmode != img.mode:
+            return None
+        width = tile[1][2] - tile[1][0]
+        stride = width * len(Image.new(img.mode, (1, 1)).tobytes())
+    return stride, ystep
+
+
+def _replace_tile(tile, extents, offset):
+    if hasattr(tile, '_replace'):
+        return tile._replace(extents=extents, offset=offset)
+    return (tile[0], extents, offset, tile[3])
+
+
+def _load_rows(source_path, top, bottom):
+    """
+    Decodes only the rows [top, bottom) of a raw-tiled image (rounded out to whole
+    strips/tiles). Returns (band_image, first_row_of_band).
+    """
+    band = Image.open(source_path)
+    tiles = []
+    for tile in band.tile:
+        x0, y0, x1, y1 = tile[1]
+        if y1 <= top or y0 >= bottom:
+            continue
+        if len(band.tile) == 1:
+            # One big tile: narrow it to the requested rows
+            stride, ystep = _row_layout(band, tile)
+            r0, r1 = max(y0, top), min(y1, bottom)
+            skip = (r0 - y0) if ystep == 1 else (y1 - r1)
+            tile = _replace_tile(tile, (x0, r0, x1, r1), tile[2] + skip * stride)
+        tiles.append(tile)
+
+    band_top = min(t[1][1] for t in tiles)
+    band_bottom = max(t[1][3] for t in tiles)
+    band.tile = [_replace_tile(t, (t[1][0], t[1][1] - band_top, t[1][2], t[1][3] - band_top), t[2]) for t in tiles]
+    band._size = (band.width, band_bottom - band_top)
+    if hasattr(band, '_tile_size'):
+        # TIFF allocates its buffer from _tile_size rather than size
+        band._tile_size = band._size
+    band.load()
+    return band, band_top
+
+
+def resize_in_strips(source_path, img, size):
+    """
+    LANCZOS-resizes a raw-tiled image to size without ever holding the full-resolution
+    bitmap. Does the same two passes as Image.resize: bands of source rows are decoded
+    and resized horizontally one at a time, then the narrowed image is resized
+    vertically in one go, so the result is identical to a whole-image resize.
+    """
+    width, height = img.size
+    out_width, out_height = size
+    # Image.resize filters these premultiplied, and keeps them so between its passes
+    premultiplied = {'RGBA': 'RGBa', 'LA': 'La'}.get(img.mode)
+    rows = max(1, STRIP_BAND_PIXELS // width)
+
+    narrow = Image.new(premultiplied or img.mode, (out_width, height))
+    top = 0
+    while top < height:
+        band, band_top = _load_rows(source_path, top, min(top + rows, height))
+        with band:
+            part = band.convert(premultiplied) if premultiplied else band
+            part = part.resize((out_width, band.height), Image.Resampling.LANCZOS)
+            # Bands are rounded out to whole strips, continue after this one
+            top = band_top + band.height
+        narrow.paste(part, (0, band_top))
+
+    result = narrow.resize(size, Image.Resampling.LANCZOS)
+    return result.convert(img.mode) if premultiplied else result
+
+
+def probe_pixels(source_path, params):
+    """
+    Returns (source pixels, pixels a worker will hold in memory) for this image,
+    from the header only. The first is the scheduling cost, the second the budget
+    cost: the decoded source, or what resize_in_strips holds when process_image will
+    downscale it in strips, plus the output bitmaps.
+    """
+    with Image.open(source_path) as img:
+        width, height = img.size
+        pixels = width * height
+        sizes = [compute_target_size(width, height, rendition_params)
+                 for rendition_params, _ in get_renditions(source_path, params)]
+        output_pixels = sum(w * h for w, h in sizes)
+
+        # Same test as process_image
+        new_width = max(w for w, _ in sizes)
+        downscale = new_width < width and max(h for _, h in sizes) < height
+        if pixels > params.get('strip_threshold', STRIP_THRESHOLD) and downscale and can_resize_in_strips(img):
+            # A band (plus its resized copy) and the horizontally resized image, see resize_in_strips
+            return pixels, min(pixels, STRIP_BAND_PIXELS * 2 + new_width * height) + output_pixels
+        return pixels, pixels + output_pixels
+
+
+def get_output_path(dest_path, params):
+    """
+    Returns the path process_image writes to, which depends on the output format.
+    """
+    output_format = params.get('output_format', 'Original')
+    if output_format != 'Original':
+        # Change extension
+        root, ext = os.path.splitext(dest_path)
+        dest_path = root + '.' + output_format.lower()
+    return dest_path
+
+
+def get_renditions(dest_path, params, dest_dir=None):
+    """
+    Returns a list of (params, output_path) for every output of one source image.
+    Without params['renditions'] that is just the single regular output. Each
+    rendition dict overrides the top-level params (mode, value, output_format,
+    quality, ...) and is written below dest_dir/<subfolder>.
+    """
+    renditions = params.get('renditions')
+    if not renditions:
+        return [(params, get_output_path(dest_path, params))]
+
+    if dest_dir is None:
+        dest_dir = os.path.dirname(dest_path)
+    relative_path = os.path.relpath(dest_path, dest_dir)
+
+    outputs = []
+    for rendition in renditions:
+        rendition_params = {k: v for k, v in params.items() if k != 'renditions'}
+        rendition_params.update(rendition)
+
+        subfolder = rendition.get('subfolder')
+        if not subfolder:
+            value = rendition_params.get('value')
+            if isinstance(value, (tuple, list)):
+                value = "x".join(str(v) for v in value)
+            subfolder = f"{rendition_params.get('mode')}_{value}"
+
+        output_path = os.path.join(dest_dir, subfolder, relative_path)
+        outputs.append((rendition_params, get_output_path(output_path, rendition_params)))
+    return outputs
+
+
+def save_image(img, output_path, params, timer=None):
+    """
+    Encodes img to output_path using the format and quality from params.
+    Returns the number of bytes written.
+    """
+    timer = timer or StageTimer()
+    quality = params.get('quality', 95)
+    output_format = params.get('output_format', 'Original')
+    image_format = Image.registered_extensions()[os.path.splitext(output_path)[1].lower()]
+
+    profile = ENCODER_PROFILES.get(params.get('encoder_profile', 'balanced'), ENCODER_PROFILES['balanced'])
+    save_kwargs = {'quality': quality}
+    save_kwargs.update(profile.get(image_format, {}))
+    if image_format == 'WEBP' and params.get('lossless'):
+        save_kwargs['lossless'] = True # quality then sets compression effort
+
+    if output_format != 'Original':
+        # Handle format specific requirements
+        if output_format == 'JPG':
+            if img.mode in ('RGBA', 'P'):
+                img = img.convert('RGB')
+        elif output_format == 'WEBP':
+            save_kwargs['quality'] = quality # WebP also uses quality
+        elif output_format == 'PNG':
+            save_kwargs.pop('quality', None) # PNG is lossless, doesn't use quality param in same way (uses compress_level)
+    timer.lap('convert')
+
+    # Encode in memory first so encoding and disk writes are timed separately
+    buffer = io.BytesIO()
+    img.save(buffer, format=image_format, **save_kwargs)
+    timer.lap('encode')
+
+    if os.path.exists(output_path) and os.stat(output_path).st_nlink > 1:
+        # Probably a hardlink to the source from a pass-through run; don't write through it
+        os.remove(output_path)
+    with open(output_path, 'wb') as f:
+        f.write(buffer.getbuffer())
+    timer.lap('write')
+    return buffer.tell()
+
+
+def can_pass_through(img, size, output_path, params):
+    """
+    True if the single output would just be img re-encoded at its own size in its
+    own format, so the source file can be used as is (see pass_through). Only with
+    output_format 'Original': an explicit format may come with a quality or encoder
+    profile meant to shrink the file.
+    """
+    if params.get('renditions') or params.get('lossless') or params.get('passthrough') == 'off':
+        return False
+    if params.get('output_format', 'Original') != 'Original':
+        return False
+    if tuple(size) != img.size:
+        return False
+    return Image.registered_extensions().get(os.path.splitext(output_path)[1].lower()) == img.format
+
+
+def pass_through(source_path, output_path, method='reflink'):
+    """
+    Puts the source bytes at output_path without decoding: as a hardlink or a
+    copy-on-write clone if asked for and the filesystem allows it, else as a copy.
+    Returns the number of bytes.
+    """
+    size = os.path.getsize(source_path)
+    if os.path.exists(output_path):
+        if os.path.samefile(source_path, output_path):
+            return size  # already linked (or writing onto the source itself)
+        os.remove(output_path)
+
+    if method == 'hardlink':
+        try:
+            os.link(source_path, output_path)
+            return size
+        except OSError:
+            pass # e.g. another filesystem
+    elif method == 'reflink' and fcntl is not None:
+        try:
+            with open(source_path, 'rb') as src, open(output_path, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return size
+        except OSError:
+            pass # not supported here; copyfile overwrites the empty file
+
+    shutil.copyfile(source_path, output_path)
+    return size
+
+
+def process_image(source_path, dest_path, params, dest_dir=None):
+    """
+    Resizes a single image. Lives at module level so it can be sent to worker processes.
+    All renditions are produced from a single decode, smaller ones cascading from
+    larger intermediates. Returns a (status, message, info) tuple where info holds
+    per-stage timings and bytes in/out for ResizeStats.
+    """
+    timer = StageTimer()
+    info = {'timings': timer.stages, 'bytes_in': os.path.getsize(source_path), 'bytes_out': 0, 'output_pixels': 0}
+
+    with Image.open(source_path) as img:
+        original_width, original_height = img.size
+        info['pixels'] = original_width * original_height
+        timer.lap('open')
+
+        if params.get('skip_vertical') and original_height > original_width:
+            return "skipped", "vertical", info
+
+        if params.get('skip_horizontal') and original_width > original_height:
+            return "skipped", "horizontal", info
+
+        outputs = []
+        for rendition_params, output_path in get_renditions(dest_path, params, dest_dir):
+            size = compute_target_size(original_width, original_height, rendition_params)
+            outputs.append((size, rendition_params, output_path))
+
+        if can_pass_through(img, outputs[0][0], outputs[0][2], params):
+            # Same size, same format: re-encoding would only cost time and quality
+            info['bytes_out'] = pass_through(source_path, outputs[0][2], params.get('passthrough', 'reflink'))
+            info['passthrough'] = True
+            timer.lap('write')
+            return "success", "copied", info
+        # Largest first, so each rendition can be cut from the previous one
+        outputs.sort(key=lambda o: o[0][0] * o[0][1], reverse=True)
+
+        new_width = max(size[0] for size, _, _ in outputs)
+        new_height = max(size[1] for size, _, _ in outputs)
+
+        downscale = new_width < original_width and new_height < original_height
+        oversized = original_width * original_height > params.get('strip_threshold', STRIP_THRESHOLD)
+
+        draft_scale, reducing_gap = SPEED_PRESETS.get(params.get('speed', 'quality'), SPEED_PRESETS['quality'])
+        if oversized and not draft_scale:
+            # Huge JPEGs can't be read in strips; decode them at no less than twice the target
+            draft_scale = SPEED_PRESETS['balanced'][0]
+        if draft_scale and downscale:
+            # JPEG only: let the decoder scale down by 1/2, 1/4 or 1/8 in the DCT domain,
+            # never going below draft_scale times the target size
+            img.draft(img.mode, (new_width * draft_scale, new_height * draft_scale))
+
+        previous = None
+        if oversized and downscale and can_resize_in_strips(img):
+            # Decoding and resampling are interleaved here and timed as 'resize'
+            previous = resize_in_strips(source_path, img, (new_width, new_height))
+            timer.lap('resize')
+
+        for (new_width, new_height), rendition_params, output_path in outputs:
+            if previous is not None and previous.size == (new_width, new_height):
+                img_resized = previous
+            else:
+                base = img
+                if previous is not None and previous.width >= new_width and previous.height >= new_height:
+                    base = previous
+
+                if base is img:
+                    img.load()
+                    timer.lap('decode')
+
+                # High quality resampling (reducing_gap does a cheap integer reduce() first,
+                # which 16-bit images don't support)
+                img_resized = base.resize((new_width, new_height), Image.Resampling.LANCZOS,
+                                          reducing_gap=reducing_gap if can_reduce(base) else None)
+                timer.lap('resize')
+
+            if params.get('renditions'):
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            info['bytes_out'] += save_image(img_resized, output_path, rendition_params, timer)
+            info['output_pixels'] += new_width * new_height
+            previous = img_resized
+
+        return "success", None, info
@@ -0,0 +1,125 @@
+import time
+import heapq
+
+STAGES = ('open', 'decode', 'resize', 'convert', 'encode', 'write')
+
+
+class StageTimer:
+    """
+    Accumulates the time between successive lap() calls under stage names.
+    """
+    def __init__(self):
+        self.stages = {}
+        self.last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self.last
+        self.last = now
+
+
+class ResizeStats:
+    """
+    Per-file and aggregate statistics of a resize run.
+    Stage totals are summed over all workers, so with several workers they can
+    exceed the wall-clock time in 'elapsed'.
+    """
+    def __init__(self, slowest=10):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.files = 0
+        self.by_status = {}
+        self.stage_totals = dict.fromkeys(STAGES, 0.0)
+        self.discovery_time = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.pixels = 0  # source pixels of successfully resized images
+        self.output_pixels = 0
+        self.passed_through = 0  # copied/linked instead of resized
+        self.slowest_n = slowest
+        self._slowest = []  # min-heap of (seconds, order, record)
+
+    def add(self, file, status, info=None):
+        """
+        Records one file; info is the dict returned by process_image (or None).
+        Returns the per-file record.
+        """
+        self.files += 1
+        self.by_status[status] = self.by_status.get(status, 0) + 1
+
+        record = {'file': file, 'status': status, 'timings': {}, 'bytes_in': 0, 'bytes_out': 0}
+        if info:
+            record.update(info)
+            for stage, seconds in info['timings'].items():
+                self.stage_totals[stage] = self.stage_totals.get(stage, 0.0) + seconds
+            self.bytes_in += info['bytes_in']
+            self.bytes_out += info['bytes_out']
+            if info.get('passthrough'):
+                self.passed_through += 1
+            elif status == 'success':
+                self.pixels += info.get('pixels', 0)
+                self.output_pixels += info.get('output_pixels', 0)
+
+            total = sum(info['timings'].values())
+            entry = (total, self.files, record)
+            if len(self._slowest) < self.slowest_n:
+                heapq.heappush(self._slowest, entry)
+            elif total > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+        return record
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def throughput(self):
+        """
+        Returns (images per second, source MB per second) so far.
+        """
+        elapsed = self.elapsed
+        if not elapsed:
+            return 0.0, 0.0
+        return self.by_status.get('success', 0) / elapsed, self.bytes_in / 1048576 / elapsed
+
+    def slowest(self):
+        return [(seconds, record) for seconds, _, record in sorted(self._slowest, key=lambda e: -e[0])]
+
+    def to_dict(self):
+        elapsed = self.elapsed
+        images_per_second, megabytes_per_second = self.throughput()
+        return {
+            'elapsed_seconds': round(elapsed, 3),
+            'files': self.files,
+            'by_status': dict(self.by_status),
+            'discovery_seconds': round(self.discovery_time, 3),
+            'stage_seconds': {k: round(v, 3) for k, v in self.stage_totals.items()},
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'pixels': self.pixels,
+            'passed_through': self.passed_through,
+            'images_per_second': round(images_per_second, 2),
+            'megabytes_per_second': round(megabytes_per_second, 2),
+            'slowest': [{'file': r['file'], 'seconds': round(s, 3)} for s, r in self.slowest()],
+        }
+
+    def summary(self):
+        """
+        Returns a few human readable lines for the log.
+        """
+        data = self.to_dict()
+        stage_total = sum(self.stage_totals.values()) or 1
+        stages = ", ".join(f"{k} {v:.1f}s ({v / stage_total:.0%})" for k, v in self.stage_totals.items() if v)
+        lines = [
+            f"Time: {data['elapsed_seconds']:.1f}s, {data['images_per_second']} images/s, "
+            f"{data['megabytes_per_second']} MB/s, "
+            f"discovery {data['discovery_seconds']:.1f}s",
+            f"Stages: {stages}",
+            f"Data: {self.bytes_in / 1048576:.1f} MB in, {self.bytes_out / 1048576:.1f} MB out",
+        ]
+        slowest = self.slowest()[:3]
+        if slowest:
+            lines.append("Slowest: " + ", ".join(f"{r['file']} ({s:.2f}s)" for s, r in slowest))
+        return lines
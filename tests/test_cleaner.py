@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+import cleaner
+from cleaner import ImageCleaner
+from hashindex import cluster_pairs
+
+# A~B and B~C are within 3 bits, A and C are 6 apart
+A, B, C = 0b000000, 0b000111, 0b111111
+
+
+def test_cluster_pairs_components():
+    pairs = [(0, 1, 2), (1, 2, 3), (3, 4, 0)]
+    assert cluster_pairs(6, pairs) == [[0, 1, 2], [3, 4]]
+
+
+def test_cluster_pairs_order_independent():
+    pairs = [(0, 1, 3), (1, 2, 3), (2, 3, 1)]
+    values = [A, B, C, C]
+    expected = cluster_pairs(4, pairs, values, max_diameter=3)
+    assert cluster_pairs(4, list(reversed(pairs)), values, max_diameter=3) == expected
+
+
+def test_cluster_pairs_chain_without_max_diameter():
+    assert cluster_pairs(3, [(0, 1, 3), (1, 2, 3)], [A, B, C]) == [[0, 1, 2]]
+
+
+def test_cluster_pairs_max_diameter_breaks_chain():
+    # A and C are too far apart to share a group; the closest pair wins
+    assert cluster_pairs(3, [(0, 1, 3), (1, 2, 2)], [A, B, 0b011111], max_diameter=3) == [[1, 2]]
+
+
+def test_cluster_pairs_no_pairs():
+    assert cluster_pairs(3, []) == []
+
+
+@pytest.fixture
+def scan(tmp_path, monkeypatch):
+    """
+    Runs find_duplicates on files whose perceptual hashes are given by name.
+    """
+    def run(values, **kwargs):
+        for name in values:
+            # Different bytes, so none of them are exact duplicates unless a test wrote them
+            path = tmp_path / f"{name}.png"
+            if not path.exists():
+                path.write_bytes(name.encode())
+        monkeypatch.setattr(cleaner, 'hash_image',
+                            lambda path, algorithm='phash': f"{values[os.path.basename(path)[:-4]]:016x}")
+        image_cleaner = ImageCleaner()
+        groups = image_cleaner.find_duplicates(str(tmp_path), workers=1, **kwargs)
+        names = [[os.path.basename(p)[:-4] for p in group] for group in groups]
+        return image_cleaner, names
+    return run
+
+
+def path_of(image_cleaner, name):
+    return next(p for group in image_cleaner.groups for p in group if os.path.basename(p) == f"{name}.png")
+
+
+def test_chain_is_one_group(scan):
+    _, groups = scan({'a': A, 'b': B, 'c': C}, threshold=3)
+    assert groups == [['a', 'b', 'c']]
+
+
+def test_chain_with_max_diameter(scan):
+    _, groups = scan({'a': A, 'b': B, 'c': C}, threshold=3, max_diameter=3)
+    assert len(groups) == 1 and len(groups[0]) == 2 and 'b' in groups[0]
+
+
+def test_remove_middle_of_chain_dissolves_group(scan):
+    image_cleaner, _ = scan({'a': A, 'b': B, 'c': C}, threshold=3)
+    changes = image_cleaner.remove_files([path_of(image_cleaner, 'b')])
+    # Without B, A and C are not linked
+    assert changes == [(0, [])]
+    assert image_cleaner.groups == []
+
+
+def test_remove_end_of_chain_keeps_group(scan):
+    image_cleaner, _ = scan({'a': A, 'b': B, 'c': C}, threshold=3)
+    c = path_of(image_cleaner, 'c')
+    changes = image_cleaner.remove_files([path_of(image_cleaner, 'a')])
+    assert changes == [(0, [[path_of(image_cleaner, 'b'), c]])]
+    assert len(image_cleaner.groups) == 1
+
+
+def test_remove_splits_group(scan):
+    # x~a~b~c~d in a line; removing b leaves x~a and c~d
+    values = {'x': 0b1 << 40, 'a': A, 'b': B, 'c': C, 'd': C | 0b11 << 20}
+    image_cleaner, groups = scan(values, threshold=3)
+    assert groups == [['a', 'b', 'c', 'd', 'x']]
+
+    image_cleaner.remove_files([path_of(image_cleaner, 'b')])
+    names = [[os.path.basename(p)[:-4] for p in group] for group in image_cleaner.groups]
+    assert names == [['a', 'x'], ['c', 'd']]
+
+
+def test_remove_leaves_other_groups_alone(scan):
+    far = 0xFFFF << 40
+    image_cleaner, groups = scan({'a': A, 'b': 0b1, 'p': far, 'q': far | 0b1}, threshold=3)
+    assert groups == [['a', 'b'], ['p', 'q']]
+
+    changes = image_cleaner.remove_files([path_of(image_cleaner, 'p')])
+    assert changes == [(1, [])]
+    assert [[os.path.basename(p)[:-4] for p in g] for g in image_cleaner.groups] == [['a', 'b']]
+
+
+def test_exact_copies_survive_removing_the_representative(tmp_path, scan):
+    (tmp_path / "a2.png").write_bytes(b"a")  # same bytes as a.png
+    image_cleaner, groups = scan({'a': A, 'a2': A, 'b': B}, threshold=3)
+    assert groups == [['a', 'a2', 'b']]
+
+    image_cleaner.remove_files([path_of(image_cleaner, 'a')])
+    assert [[os.path.basename(p)[:-4] for p in g] for g in image_cleaner.groups] == [['a2', 'b']]
@@ -0,0 +1,76 @@
+import random
+import threading
+
+import pytest
+
+import hashindex
+from hashindex import BACKENDS, find_pairs, hamming, hash_bands
+
+
+def brute_force(hashes, threshold):
+    return sorted((i, j, hamming(hashes[i], hashes[j]))
+                  for i in range(len(hashes)) for j in range(i + 1, len(hashes))
+                  if hamming(hashes[i], hashes[j]) <= threshold)
+
+
+def make_hashes(count, seed=0, bits=64):
+    rng = random.Random(seed)
+    base = [rng.getrandbits(bits) for _ in range(count // 2)]
+    # Near copies at 0..12 bits from their original, so every threshold finds some
+    near = []
+    for value in base:
+        for bit in rng.sample(range(bits), rng.randrange(13)):
+            value ^= 1 << bit
+        near.append(value)
+    return base + near + base[:3]  # plus a few exact repeats
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('threshold', [0, 1, 5, 8, 12])
+def test_find_pairs_matches_brute_force(backend, threshold):
+    hashes = make_hashes(300)
+    assert find_pairs(hashes, threshold, backend=backend) == brute_force(hashes, threshold)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_find_pairs_short_hashes(backend):
+    # colorhash is 42 bits, so hashes don't fill the whole uint64
+    hashes = make_hashes(200, seed=1, bits=42)
+    assert find_pairs(hashes, 4, backend=backend) == brute_force(hashes, 4)
+
+
+@pytest.mark.parametrize('block_elements', [1, 7, 300, 1000])
+def test_numpy_blocks(monkeypatch, block_elements):
+    # Pairs straddling block boundaries must be found exactly once
+    monkeypatch.setattr(hashindex, 'BLOCK_ELEMENTS', block_elements)
+    hashes = make_hashes(101, seed=2)
+    assert find_pairs(hashes, 6, backend='numpy') == brute_force(hashes, 6)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_find_pairs_edge_cases(backend):
+    assert find_pairs([], 5, backend=backend) == []
+    assert find_pairs([123], 5, backend=backend) == []
+    assert find_pairs([0, 0], 0, backend=backend) == [(0, 1, 0)]
+
+
+def test_find_pairs_progress_and_stop():
+    hashes = make_hashes(200, seed=3)
+    reported = []
+    find_pairs(hashes, 5, progress_callback=reported.append)
+    assert reported and reported[-1] == pytest.approx(1.0)
+
+    stop = threading.Event()
+    stop.set()
+    assert find_pairs(hashes, 5, stop_event=stop) == []
+
+
+@pytest.mark.parametrize('bits, threshold', [(64, 0), (64, 5), (42, 4), (64, 9)])
+def test_hash_bands_cover_all_bits(bits, threshold):
+    bands = hash_bands(bits, threshold)
+    assert len(bands) == threshold + 1
+    covered = 0
+    for shift, mask in bands:
+        assert covered & (mask << shift) == 0
+        covered |= mask << shift
+    assert covered == (1 << bits) - 1
@@ -0,0 +1,83 @@
+import os
+
+from manifest import ResizeManifest, params_fingerprint
+
+# What main.py passes: Tk checkboxes give 0/1, some params are left out
+GUI_PARAMS = {
+    'mode': 'max',
+    'value': 1920,
+    'quality': 85,
+    'no_enlarge': 1,
+    'skip_vertical': 0,
+    'skip_horizontal': 0,
+    'keep_structure': 1,
+    'incremental': 1,
+    'output_format': 'JPG',
+    'speed': 'quality',
+    'encoder_profile': 'balanced',
+}
+
+# What cli.py passes for the same settings
+CLI_PARAMS = {
+    'mode': 'max',
+    'value': 1920,
+    'quality': 85,
+    'no_enlarge': True,
+    'skip_vertical': False,
+    'skip_horizontal': False,
+    'keep_structure': True,
+    'output_format': 'JPG',
+    'speed': 'quality',
+    'encoder_profile': 'balanced',
+    'lossless': False,
+    'incremental': True,
+    'schedule': 'largest',
+    'passthrough': 'reflink',
+    'workers': 8,
+}
+
+
+def test_gui_and_cli_params_agree():
+    assert params_fingerprint(GUI_PARAMS) == params_fingerprint(CLI_PARAMS)
+
+
+def test_fingerprint_is_stable():
+    # Same params, different order
+    assert params_fingerprint(dict(reversed(list(CLI_PARAMS.items())))) == params_fingerprint(CLI_PARAMS)
+
+
+def test_runtime_params_are_ignored():
+    runtime = dict(CLI_PARAMS, workers=1, schedule='walk', pixel_budget=10, profile='out.prof', incremental=False)
+    assert params_fingerprint(runtime) == params_fingerprint(CLI_PARAMS)
+
+
+def test_passthrough_methods_write_the_same():
+    assert params_fingerprint(dict(CLI_PARAMS, passthrough='hardlink')) == params_fingerprint(CLI_PARAMS)
+    assert params_fingerprint(dict(CLI_PARAMS, passthrough='off')) != params_fingerprint(CLI_PARAMS)
+
+
+def test_output_params_change_the_fingerprint():
+    base = params_fingerprint(CLI_PARAMS)
+    for key, value in [('quality', 90), ('value', 1024), ('output_format', 'WEBP'), ('no_enlarge', False),
+                       ('encoder_profile', 'smallest'), ('lossless', True), ('renditions', [{'mode': 'max', 'value': 320}])]:
+        assert params_fingerprint(dict(CLI_PARAMS, **{key: value})) != base, key
+
+
+def test_manifest_round_trip(tmp_path):
+    source = tmp_path / "a.jpg"
+    source.write_bytes(b"data")
+    output = tmp_path / "out" / "a.jpg"
+    output.parent.mkdir()
+    output.write_bytes(b"out")
+    stat = os.stat(source)
+
+    manifest = ResizeManifest(str(tmp_path / "out"), CLI_PARAMS)
+    manifest.record(str(source), stat, [str(output)])
+    manifest.save()
+
+    # A GUI run with the same settings sees it as done
+    assert ResizeManifest(str(tmp_path / "out"), GUI_PARAMS).is_up_to_date(str(source), stat)
+    assert not ResizeManifest(str(tmp_path / "out"), dict(CLI_PARAMS, quality=50)).is_up_to_date(str(source), stat)
+
+    output.unlink()
+    assert not ResizeManifest(str(tmp_path / "out"), CLI_PARAMS).is_up_to_date(str(source), stat)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+import resizer
+
+SIZE = (700, 900)
+
+
+def make_image(mode, seed=0):
+    rng = np.random.RandomState(seed)
+    channels = len(Image.new(mode, (1, 1)).getbands())
+    pixels = (rng.rand(SIZE[1], SIZE[0], channels) * 255).astype('uint8')
+    if mode == 'RGBA':
+        # Mostly transparent: premultiplied alpha magnifies any difference there
+        pixels[:, :, 3] = (rng.rand(SIZE[1], SIZE[0]) * 12).astype('uint8')
+    if channels == 1:
+        pixels = pixels[:, :, 0]
+    return Image.fromarray(pixels, mode)
+
+
+@pytest.fixture(autouse=True)
+def small_bands(monkeypatch):
+    # Many bands even for a small test image
+    monkeypatch.setattr(resizer, 'STRIP_BAND_PIXELS', 50_000)
+
+
+@pytest.mark.parametrize('mode, extension', [
+    ('RGB', '.tif'),
+    ('L', '.tif'),
+    ('RGBA', '.tif'),
+    ('RGB', '.bmp'),  # stored bottom-up
+    ('L', '.bmp'),
+])
+@pytest.mark.parametrize('size', [(350, 450), (349, 449), (101, 133), (700, 301), (233, 900)])
+def test_strips_match_whole_image_resize(tmp_path, mode, extension, size):
+    path = str(tmp_path / f"source{extension}")
+    make_image(mode).save(path)
+
+    with Image.open(path) as img:
+        assert resizer.can_resize_in_strips(img)
+        strips = resizer.resize_in_strips(path, img, size)
+    with Image.open(path) as img:
+        whole = img.resize(size, Image.Resampling.LANCZOS)
+
+    assert strips.mode == whole.mode
+    assert strips.size == whole.size
+    assert np.array_equal(np.asarray(strips), np.asarray(whole))
+
+
+def test_process_image_uses_strips(tmp_path, monkeypatch):
+    path = str(tmp_path / "source.tif")
+    make_image('RGB').save(path)
+    used = []
+    monkeypatch.setattr(resizer, 'resize_in_strips',
+                        lambda *args: used.append(args) or resizer.Image.new('RGB', (350, 450)))
+
+    params = {'mode': 'percentage', 'value': 50, 'output_format': 'PNG', 'strip_threshold': 100_000}
+    status, _, _ = resizer.process_image(path, str(tmp_path / "out.tif"), params)
+    assert status == "success"
+    assert len(used) == 1
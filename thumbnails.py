@@ -0,0 +1,178 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from imaging import can_reduce
+
+THUMBNAIL_SIZE = (64, 64)
+
+# The disk cache is pruned to this size (least recently used first) and age, when the
+# cache is created and then every PRUNE_INTERVAL new thumbnails
+DISK_CACHE_BYTES = 50 * 1024 * 1024
+DISK_CACHE_DAYS = 30
+PRUNE_INTERVAL = 500
+
+
+class ThumbnailCache:
+    """
+    Loads small previews on a background thread pool and keeps the most recently
+    used ones in memory (LRU), optionally backed by a folder of saved thumbnails
+    that is pruned by size and age.
+    Callbacks run on a pool thread; GUIs have to hand the result to their own
+    main loop (e.g. with Tk's after()).
+    """
+    def __init__(self, size=THUMBNAIL_SIZE, capacity=500, cache_dir=None, workers=2):
+        self.size = size
+        self.capacity = capacity
+        self.cache_dir = cache_dir
+        self.images = OrderedDict()
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.disk_paths = {}  # path -> its thumbnail file, to remove it with discard()
+        self.written = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.executor.submit(self.prune_disk_cache)
+
+    def get(self, path):
+        """
+        Returns the thumbnail if it is in memory, else None.
+        """
+        with self.lock:
+            image = self.images.get(path)
+            if image is not None:
+                self.images.move_to_end(path)
+            return image
+
+    def request(self, path, callback):
+        """
+        Calls callback(path, image) once the thumbnail is available; image is None
+        if the file can't be read. Cached thumbnails are returned right away.
+        """
+        image = self.get(path)
+        if image is not None:
+            callback(path, image)
+            return
+        with self.lock:
+            if path in self.pending:
+                self.pending[path][1].append(callback)
+                return
+            # _load needs the lock to pop the entry, so it can't finish before this line
+            self.pending[path] = (self.executor.submit(self._load, path), [callback])
+
+    def cancel_pending(self):
+        """
+        Drops requests that haven't started yet, e.g. for rows that scrolled away.
+        """
+        with self.lock:
+            for path, (future, _) in list(self.pending.items()):
+                if future.cancel():
+                    del self.pending[path]
+
+    def discard(self, paths):
+        """
+        Forgets the thumbnails of paths (e.g. deleted files), on disk too.
+        """
+        with self.lock:
+            disk_paths = [self.disk_paths.pop(path, None) for path in paths]
+            for path in paths:
+                self.images.pop(path, None)
+        for disk_path in disk_paths:
+            if disk_path:
+                try:
+                    os.remove(disk_path)
+                except OSError:
+                    pass
+
+    def prune_disk_cache(self):
+        """
+        Removes saved thumbnails older than DISK_CACHE_DAYS, then the least recently
+        used ones until the folder is below DISK_CACHE_BYTES.
+        """
+        if not self.cache_dir:
+            return
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        expired = time.time() - DISK_CACHE_DAYS * 86400
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, disk_path in entries:
+            if mtime >= expired and total <= DISK_CACHE_BYTES:
+                break
+            try:
+                os.remove(disk_path)
+            except OSError:
+                continue
+            total -= size
+
+    def shutdown(self):
+        self.cancel_pending()
+        self.executor.shutdown(wait=False)
+
+    def _load(self, path):
+        try:
+            disk_path = self._disk_path(path) if self.cache_dir else None
+            image = self._read_disk_cache(disk_path) or self._make_thumbnail(path, disk_path)
+        except Exception:
+            disk_path = image = None
+
+        with self.lock:
+            if disk_path:
+                self.disk_paths[path] = disk_path
+            if image is not None:
+                self.images[path] = image
+                self.images.move_to_end(path)
+                while len(self.images) > self.capacity:
+                    self.images.popitem(last=False)
+            _, callbacks = self.pending.pop(path, (None, []))
+        for callback in callbacks:
+            callback(path, image)
+
+    def _make_thumbnail(self, path, disk_path=None):
+        with Image.open(path) as img:
+            # JPEGs are decoded at a fraction of their size; thumbnail() uses reduce() for the rest
+            img.draft('RGB', self.size)
+            if not can_reduce(img):
+                img = img.convert('RGB')
+            img.thumbnail(self.size)
+            image = img.convert('RGB')
+        if disk_path:
+            try:
+                image.save(disk_path, "JPEG", quality=85)
+            except OSError:
+                return image
+            with self.lock:
+                self.written += 1
+                prune = self.written % PRUNE_INTERVAL == 0
+            if prune:
+                self.prune_disk_cache()
+        return image
+
+    def _read_disk_cache(self, disk_path):
+        if not disk_path:
+            return None
+        try:
+            with Image.open(disk_path) as img:
+                img.load()
+                image = img.convert('RGB')
+            # Marks it as recently used for prune_disk_cache
+            os.utime(disk_path)
+            return image
+        except OSError:
+            return None
+
+    def _disk_path(self, path):
+        # Keyed by path, size and mtime so edited files get a new thumbnail
+        stat = os.stat(path)
+        key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{self.size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".jpg")
@@ -0,0 +1,57 @@
+import threading
+from collections import deque
+
+
+class UIEventQueue:
+    """
+    Thread-safe mailbox between worker threads and the GUI main loop.
+    Workers post events from any thread; the main loop calls drain() on a timer
+    and applies them, so no widget is touched from a worker thread.
+    - set_value: only the latest value per setter is kept (progress bars).
+    - add_line: lines are batched per writer so a whole batch is one insert; at most
+      max_lines are kept per writer between drains, older ones are counted as dropped.
+    - call: runs once, in posting order.
+    """
+    def __init__(self, max_lines=1000):
+        self.max_lines = max_lines
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.values = {}
+        self.lines = {}
+        self.dropped = {}
+        self.calls = []
+
+    def set_value(self, setter, value):
+        with self.lock:
+            self.values[setter] = value
+
+    def add_line(self, writer, line):
+        with self.lock:
+            lines = self.lines.get(writer)
+            if lines is None:
+                lines = self.lines[writer] = deque(maxlen=self.max_lines)
+            if len(lines) == self.max_lines:
+                self.dropped[writer] = self.dropped.get(writer, 0) + 1
+            lines.append(line)
+
+    def call(self, fn, *args):
+        with self.lock:
+            self.calls.append((fn, args))
+
+    def drain(self):
+        """
+        Applies everything posted since the last drain. Call it on the main thread.
+        Writers receive (lines, dropped count).
+        """
+        with self.lock:
+            values, lines, dropped, calls = self.values, self.lines, self.dropped, self.calls
+            self._reset()
+
+        for setter, value in values.items():
+            setter(value)
+        for writer, batch in lines.items():
+            writer(list(batch), dropped.get(writer, 0))
+        for fn, args in calls:
+            fn(*args)